@@ -1,6 +1,15 @@
 import numpy as np
 from numpy.typing import ArrayLike
 from matplotlib import pyplot as mat_plot
+import os
+import glob
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+try:
+    from scipy import ndimage # Optional - used to label connected components if it is installed.
+except ImportError:
+    ndimage = None
 
 class NumpyQueue():
     """Creates a circular queue that is implemented with a NumPy array."""
@@ -54,8 +63,9 @@ class NumpyQueue():
                 self.top_pointer = -1
                 return item
             else:
+                item = self.queue[self.bottom_pointer] # The bottom (head) pointer points at the item to remove, so it is read before the pointer moves on.
                 self.bottom_pointer = (self.bottom_pointer + 1) % self.queue.size
-                return self.queue[self.bottom_pointer]
+                return item
         except Exception as e:
             print(e)
 
@@ -77,6 +87,93 @@ class NumpyQueue():
             return True
         else:
             return False
+class NumpyIntQueue():
+    """Creates a circular queue of integers (e.g. flat pixel indexes) that is stored in a contiguous NumPy integer array, so no Python object is stored per item."""
+    def __init__(self, capacity : int, dtype : type = np.int32):
+        """Args:
+            capacity (int): The maximum number of items in the queue.
+            dtype (type, optional): The NumPy integer type of the items. Defaults to np.int32.
+
+        Raises:
+            ValueError: The capacity is not a positive integer or the dtype is not an integer type."""
+        if not isinstance(capacity, (int, np.integer)) or capacity < 1:
+            raise ValueError("The capacity of the queue must be a positive integer.")
+        if not np.issubdtype(dtype, np.integer):
+            raise ValueError("The type of the queue must be an integer type.")
+        self.queue = np.empty(int(capacity), dtype=dtype)
+        self.head = 0 # The index of the item at the head of the queue.
+        self.size = 0
+        self.high_water_mark = 0 # The largest number of items that have been in the queue at once.
+
+    @property
+    def capacity(self) -> int:
+        """The maximum number of items in the queue."""
+        return self.queue.size
+
+    def Enqueue(self, item : int) -> None:
+        """Adds an item to the tail of the queue.
+
+        Args:
+            item (int): The item to add to the queue.
+
+        Raises:
+            TypeError: The item is not an integer.
+            OverflowError: The queue is full so the item cannot be added."""
+        if not isinstance(item, (int, np.integer)) or isinstance(item, bool):
+            raise TypeError("The item to be added to the queue must be an integer.")
+        if self.size == self.queue.size:
+            raise OverflowError("Cannot add item: Queue is full.")
+        self.queue[(self.head + self.size) % self.queue.size] = item
+        self.size += 1
+        self.high_water_mark = max(self.high_water_mark, self.size)
+
+    def EnqueueMany(self, items : ArrayLike) -> None:
+        """Adds a batch of items to the tail of the queue (in order) with at most two array copies.
+
+        Args:
+            items (ArrayLike): A 1D array of integers.
+
+        Raises:
+            TypeError: The items are not integers.
+            OverflowError: The queue doesn't have space for all of the items (none of them are added)."""
+        items = np.asarray(items)
+        if items.size == 0:
+            return
+        if items.dtype.kind not in "iu":
+            raise TypeError("The items to be added to the queue must be integers.")
+        items = items.ravel()
+        if self.size + items.size > self.queue.size:
+            raise OverflowError("Cannot add items: Queue is full.")
+        tail = (self.head + self.size) % self.queue.size
+        first_part = min(items.size, self.queue.size - tail) # The items that fit before the end of the array, the rest 'loop' around to the start.
+        self.queue[tail : tail + first_part] = items[:first_part]
+        self.queue[: items.size - first_part] = items[first_part:]
+        self.size += items.size
+        self.high_water_mark = max(self.high_water_mark, self.size)
+
+    def Dequeue(self) -> int:
+        """Removes and returns the item at the head of the queue.
+
+        Raises:
+            IndexError: The queue is empty.
+
+        Returns:
+            int: The item at the head of the queue."""
+        if self.size == 0:
+            raise IndexError("Cannot dequeue item: Queue is empty.")
+        item = int(self.queue[self.head])
+        self.head = (self.head + 1) % self.queue.size
+        self.size -= 1
+        return item
+
+    def IsEmpty(self) -> bool:
+        """Returns whether the queue is empty."""
+        return self.size == 0
+
+    def IsFull(self) -> bool:
+        """Returns whether the queue is full."""
+        return self.size == self.queue.size
+
 def validate_filename(filename : str) -> None:
     """Validates a given filename to see if it is suitable to use.
 
@@ -110,6 +207,76 @@ def validate_colour_thresholds(lower : int, upper : int) -> None:
     if (upper < 0 or upper > 255) or (lower < 0 or lower > 255):
         raise ValueError("The upper_threshold and/or lower_threshold arguments are not in the correct range (0 - 255)")
     
+COLOUR_RULES = {
+    "red": ("high", "low", "low"), # The condition of the red, green and blue channels for a pixel to be that colour.
+    "cyan": ("low", "high", "high")
+}
+
+def load_rgb_image(map_filename : str, directory : str = "./data") -> np.ndarray:
+    """Returns the red, green and blue channels of an image (or a '.npy' array of one) as a uint8 array (0 - 255).
+
+    Args:
+        map_filename (str): The name of the image file.
+        directory (str, optional): The folder the image is in. Defaults to "./data".
+
+    Returns:
+        ndarray: A 3D uint8 array of shape (rows, columns, 3)."""
+    validate_filename(map_filename)
+    path = os.path.join(directory, map_filename)
+    img = np.load(path) if map_filename.endswith('.npy') else mat_plot.imread(path)
+    if img.ndim == 2: # Greyscale images only have one channel.
+        img = np.stack([img] * 3, axis=2)
+    if img.dtype.kind == 'f': # PNG images are read as floats from 0 to 1.
+        return np.rint(img[:, :, :3] * 255).astype(np.uint8)
+    return img[:, :, :3].astype(np.uint8)
+
+def classify_colours(rgb_img : np.ndarray, rules : dict[str, tuple[str, str, str]] = COLOUR_RULES, upper_threshold : int = 100, lower_threshold : int = 50) -> dict[str, np.ndarray]:
+    """Returns a boolean mask of the pixels that are each colour in the rules, comparing every pixel at once.
+
+    Args:
+        rgb_img (ndarray): A 3D array of the red, green and blue channels of an image (0 - 255).
+        rules (dict[str, tuple[str, str, str]], optional): The condition of the red, green and blue channels for each colour: "high" (above upper_threshold), "low" (below lower_threshold) or None (any value). Defaults to COLOUR_RULES.
+        upper_threshold (int, optional): The upper threshold of to decide if a channel is high (0 - 255). Defaults to 100.
+        lower_threshold (int, optional): The lower threshold of to decide if a channel is low (0 - 255). Defaults to 50.
+
+    Raises:
+        ValueError: A rule has an invalid condition.
+
+    Returns:
+        dict[str, ndarray]: A 2D boolean array for each colour that is True where a pixel is that colour."""
+    validate_colour_thresholds(lower_threshold, upper_threshold)
+    comparisons = {} # Each channel is only compared once for all of the rules (and only if a rule uses it).
+    masks = {}
+    for colour, conditions in rules.items():
+        if len(conditions) != 3:
+            raise ValueError("Each colour rule must have a condition for the red, green and blue channels.")
+        mask = np.ones(rgb_img.shape[:2], dtype=bool)
+        for channel, condition in enumerate(conditions):
+            if condition is None:
+                continue
+            if condition not in ["high", "low"]:
+                raise ValueError(f"'{condition}' is not a valid condition (must be 'high', 'low' or None).")
+            if (channel, condition) not in comparisons:
+                comparisons[(channel, condition)] = rgb_img[:, :, channel] > upper_threshold if condition == "high" else rgb_img[:, :, channel] < lower_threshold
+            mask &= comparisons[(channel, condition)]
+        masks[colour] = mask
+    return masks
+
+def find_colour_masks(map_filename : str, rules : dict[str, tuple[str, str, str]] = COLOUR_RULES, upper_threshold : int = 100, lower_threshold : int = 50) -> dict[str, np.ndarray]:
+    """Returns a boolean mask of where each colour in the rules occurs in an image, loading the image once.
+
+    Args:
+        map_filename (str): The name of the image file in the data folder.
+        rules (dict[str, tuple[str, str, str]], optional): The colour rules (see classify_colours()). Defaults to COLOUR_RULES.
+        upper_threshold (int, optional): The upper threshold of to decide if a channel is high (0 - 255). Defaults to 100.
+        lower_threshold (int, optional): The lower threshold of to decide if a channel is low (0 - 255). Defaults to 50.
+
+    Returns:
+        dict[str, ndarray]: A 2D boolean array for each colour that is True where a pixel is that colour."""
+    validate_filename(map_filename)
+    validate_colour_thresholds(lower_threshold, upper_threshold)
+    return classify_colours(load_rgb_image(map_filename), rules, upper_threshold, lower_threshold)
+
 def find_red_pixels(map_filename : str, upper_threshold : int = 100, lower_threshold : int = 50) -> np.ndarray:
     """Returns and saves a 2D array of where the red pixels occur in an image.
 
@@ -119,20 +286,9 @@ def find_red_pixels(map_filename : str, upper_threshold : int = 100, lower_thres
         lower_threshold (int, optional): The lower threshold of to decide if a pixel is a red colour (0 - 255). Defaults to 50.
 
     Returns:
-        ndarray: A 2D array that contains a 255 if a red pixel is at that location or a 0 otherwise."""
+        ndarray: A 2D uint8 array that contains a 255 if a red pixel is at that location or a 0 otherwise."""
     try:
-        validate_filename(map_filename)
-        validate_colour_thresholds(lower_threshold, upper_threshold)
-        
-        rgb_img = mat_plot.imread(f'./data/{map_filename}') * 255 # Scales the image returned to have the colour values range from 0 to 255 (to avoid rounding errors)
-        red_pixels = np.zeros(rgb_img.shape[:2])
-        for row in range(rgb_img.shape[0]): #iterating over every element in the 2D array rgb_img
-            for col in range(rgb_img.shape[1]):
-                red =rgb_img[row,col][0]
-                green = rgb_img[row,col][1]
-                blue = rgb_img[row, col][2]
-                if red > upper_threshold and green < lower_threshold and blue < lower_threshold: #if conditions met, then pixel is deemed to be red.
-                    red_pixels[row, col] = 255 #255 represents white
+        red_pixels = find_colour_masks(map_filename, {"red": COLOUR_RULES["red"]}, upper_threshold, lower_threshold)["red"].view(np.uint8) * 255 #255 represents white (the boolean mask is viewed as 0s and 1s without a copy)
         mat_plot.imsave('./data/map-red-pixels.jpg', red_pixels, cmap="gray")
         return red_pixels
 
@@ -140,7 +296,7 @@ def find_red_pixels(map_filename : str, upper_threshold : int = 100, lower_thres
         print(f"Returning to the intelligence module menu - {e}")
 
 def find_cyan_pixels(map_filename : str, upper_threshold : int = 100, lower_threshold : int = 50) -> np.ndarray:
-    """Returns and saves a 2D array of where the red pixels occur in an image.
+    """Returns and saves a 2D array of where the cyan pixels occur in an image.
 
     Args:
         map_filename (str): The name of the file that will contain where cyan pixels occur.
@@ -148,20 +304,9 @@ def find_cyan_pixels(map_filename : str, upper_threshold : int = 100, lower_thre
         lower_threshold (int, optional): The lower threshold of to decide if a pixel is a cyan colour (0 - 255). Defaults to 50.
 
     Returns:
-        ndarray: A 2D array that contains a 255 if a cyan pixel is at that location or a 0 otherwise."""
+        ndarray: A 2D uint8 array that contains a 255 if a cyan pixel is at that location or a 0 otherwise."""
     try:
-        validate_filename(map_filename)
-        validate_colour_thresholds(lower_threshold, upper_threshold)
-
-        rgb_img = mat_plot.imread(f'./data/{map_filename}') * 255
-        cyan_pixels = np.zeros(rgb_img.shape[:2])
-        for row in range(rgb_img.shape[0]):
-            for col in range(rgb_img.shape[1]):
-                red =rgb_img[row,col][0]
-                green = rgb_img[row,col][1]
-                blue = rgb_img[row, col][2]
-                if red < lower_threshold and green > upper_threshold and blue > upper_threshold: #pixel is deemed to be red.
-                    cyan_pixels[row, col] = 255
+        cyan_pixels = find_colour_masks(map_filename, {"cyan": COLOUR_RULES["cyan"]}, upper_threshold, lower_threshold)["cyan"].view(np.uint8) * 255
         mat_plot.imsave('./data/map-cyan-pixels.jpg', cyan_pixels, cmap='gray')
         return cyan_pixels
     except Exception as e:
@@ -206,6 +351,82 @@ def find_pixel_neighbours(pixel_location : tuple[int, int], img_shape : tuple[in
         eight_neighbours.append((row + 1, col + 1))
     return eight_neighbours
 
+class Neighbourhood():
+    """The neighbours of a pixel, defined by a structuring element, precomputed as offsets. Images are padded with a border so the neighbours of every pixel in the image are inside the padded image and no bounds checks are needed for each pixel."""
+    def __init__(self, connectivity : int | ArrayLike = 8):
+        """Args:
+            connectivity (int | ArrayLike, optional): 4 (the pixels above, below, left and right), 8 (including the diagonal pixels) or a custom structuring element as a 2D boolean array with an odd number of rows and columns, centred on the pixel. Defaults to 8.
+
+        Raises:
+            ValueError: The connectivity is not 4, 8 or a valid structuring element."""
+        if isinstance(connectivity, (int, np.integer)):
+            if connectivity == 4:
+                structure = np.array([[False, True, False], [True, False, True], [False, True, False]])
+            elif connectivity == 8:
+                structure = np.ones((3, 3), dtype=bool)
+            else:
+                raise ValueError("The connectivity must be 4, 8 or a structuring element")
+        else:
+            structure = np.array(connectivity, dtype=bool)
+            if structure.ndim != 2 or structure.shape[0] % 2 == 0 or structure.shape[1] % 2 == 0:
+                raise ValueError("The structuring element must be a 2D array with an odd number of rows and columns")
+        centre = (structure.shape[0] // 2, structure.shape[1] // 2)
+        structure[centre] = False # A pixel isn't its own neighbour.
+        self.structure = structure
+        self.radius = max(centre) # The width of the border added by pad().
+        self.offsets = np.argwhere(structure) - centre # The (row, column) offset of each neighbour, row by row.
+
+    def pad(self, IMG : np.ndarray, value : any = 0) -> np.ndarray:
+        """Returns the image with a border that is wide enough to contain the neighbours of every pixel.
+
+        Args:
+            IMG (ndarray): A 2D array.
+            value (any, optional): The value of the border. Defaults to 0.
+
+        Returns:
+            ndarray: The padded image."""
+        return np.pad(IMG, self.radius, constant_values=value)
+
+    def flat_offsets(self, padded_cols : int) -> np.ndarray:
+        """Returns the offset of each neighbour in the flat indexes (row * padded_cols + col) of a padded image.
+
+        Args:
+            padded_cols (int): The number of columns of the padded image.
+
+        Returns:
+            ndarray: The offset of each neighbour."""
+        return self.offsets[:, 0] * padded_cols + self.offsets[:, 1]
+
+    def neighbour_views(self, padded : np.ndarray) -> list[np.ndarray]:
+        """Returns a view of a padded image for each neighbour, where each pixel of the (unpadded) image is at the position of its neighbour.
+
+        Args:
+            padded (ndarray): An image padded with pad().
+
+        Returns:
+            list[ndarray]: A view with the shape of the unpadded image for each neighbour."""
+        rows, cols = padded.shape[0] - 2 * self.radius, padded.shape[1] - 2 * self.radius
+        return [padded[self.radius + row : self.radius + row + rows, self.radius + col : self.radius + col + cols] for row, col in self.offsets]
+
+def dilate_mask(mask : ArrayLike, connectivity : int | ArrayLike = 8, iterations : int = 1) -> np.ndarray:
+    """Returns a boolean mask where each pixel is True if it or one of its neighbours is True in the mask (a morphological dilation).
+
+    Args:
+        mask (ArrayLike): A 2D binary image (255 or True where there is a white pixel).
+        connectivity (int | ArrayLike, optional): The neighbours of a pixel (see Neighbourhood). Defaults to 8.
+        iterations (int, optional): The number of times to dilate the mask. Defaults to 1.
+
+    Returns:
+        ndarray: The dilated boolean mask."""
+    neighbourhood = Neighbourhood(connectivity)
+    mask = np.asarray(mask)
+    dilated = mask.copy() if mask.dtype == bool else mask == 255
+    for _ in range(iterations):
+        padded = neighbourhood.pad(dilated, False)
+        for neighbours in neighbourhood.neighbour_views(padded):
+            dilated |= neighbours
+    return dilated
+
 def validate_2D_array(inp : any) -> None:
     """Validates argument to ensure that it can be converted to/ is in the form of a 2D numpy array.
 
@@ -219,11 +440,125 @@ def validate_2D_array(inp : any) -> None:
     if not len(inp.shape) == 2: #length of the tuple must be 2 (for a 2D array)
         raise ValueError("The argument IMG must be a 2D array")
     
-def detect_connected_components(IMG : ArrayLike) -> np.ndarray:
-    """Returns all 8-connected components in the image, defined in a 2D array, and saves the connected components and sizes to a text file.
+def get_label_dtype(max_label : int) -> np.dtype:
+    """Returns the smallest unsigned integer dtype that can store the labels from 0 to max_label (e.g. uint8 for up to 255 connected components).
+
+    Args:
+        max_label (int): The largest label.
+
+    Returns:
+        dtype: The dtype of the labels."""
+    return np.min_scalar_type(max(int(max_label), 0))
+
+def find_equivalence_roots(num_items : int, first_items : np.ndarray, second_items : np.ndarray) -> np.ndarray:
+    """Returns the root of every item after joining each pair of items (first_items[i], second_items[i]) into the same set with a vectorized union-find. The root of a set is its smallest item.
+
+    Args:
+        num_items (int): The number of items (numbered from 0).
+        first_items (ndarray): The first item of each pair.
+        second_items (ndarray): The second item of each pair.
+
+    Returns:
+        ndarray: The root of each item."""
+    parent = np.arange(num_items)
+    while True:
+        grandparent = parent[parent]
+        while not np.array_equal(grandparent, parent): # Path compression so every item points directly at its root.
+            parent = grandparent
+            grandparent = parent[parent]
+        first_roots, second_roots = parent[first_items], parent[second_items]
+        is_separate = first_roots != second_roots
+        if not np.any(is_separate):
+            return parent
+        np.minimum.at(parent, np.maximum(first_roots, second_roots)[is_separate], np.minimum(first_roots, second_roots)[is_separate]) # Union of the two roots.
+
+def label_connected_components(IMG : ArrayLike, connectivity : int = 8) -> tuple[np.ndarray, np.ndarray]:
+    """Returns the connected components of the white (255) pixels in an image using a two-pass union-find algorithm over runs of pixels (or scipy.ndimage.label if SciPy is installed). The components are numbered in the order their first pixel occurs (row by row), the same as detect_connected_components() with the breadth-first search.
+
+    Args:
+        IMG (ArrayLike): A binary image as a 2D array (255 or True where there is a white pixel).
+        connectivity (int, optional): 8 if diagonal pixels are connected or 4 if only the pixels above, below, left and right are connected. Defaults to 8.
+
+    Raises:
+        ValueError: The connectivity is not 4 or 8.
+
+    Returns:
+        tuple[ndarray, ndarray]: The 2D MARK array (0 where there is no connected component), with the smallest unsigned integer dtype that fits the number of connected components, and the size of each connected component (the size of component n is at index n - 1)."""
+    if connectivity not in [4, 8]:
+        raise ValueError("The connectivity must be 4 or 8")
+    IMG = np.asarray(IMG)
+    foreground = IMG if IMG.dtype == bool else IMG == 255
+    rows, cols = foreground.shape
+    if ndimage is not None:
+        structure = np.ones((3, 3), dtype=bool) if connectivity == 8 else ndimage.generate_binary_structure(2, 1)
+        MARK, num_components = ndimage.label(foreground, structure=structure)
+        return MARK.astype(get_label_dtype(num_components)), np.bincount(MARK.ravel(), minlength=num_components + 1)[1:]
+    # First pass - find the runs of consecutive white pixels in each row and which runs in consecutive rows touch.
+    width = cols + 1 # An extra black column is added to each row so runs can't continue onto the next row.
+    padded = np.zeros((rows, width), dtype=np.int8)
+    padded[:, :cols] = foreground
+    changes = np.diff(padded.ravel(), prepend=0)
+    run_starts = np.flatnonzero(changes == 1) # The index of the first pixel of each run in the padded image.
+    run_ends = np.flatnonzero(changes == -1) # The index after the last pixel of each run.
+    num_runs = len(run_starts)
+    diagonal = 1 if connectivity == 8 else 0
+    first_touching = np.searchsorted(run_ends, run_starts + width - diagonal, side="right") # The runs in the next row that touch each run.
+    after_touching = np.searchsorted(run_starts, run_ends + width + diagonal, side="left")
+    num_touching = np.maximum(after_touching - first_touching, 0)
+    upper_runs = np.repeat(np.arange(num_runs), num_touching)
+    lower_runs = np.repeat(first_touching, num_touching) + np.arange(num_touching.sum()) - np.repeat(np.cumsum(num_touching) - num_touching, num_touching)
+    # Union-find - every run points to a parent run with a smaller index, so the root of each component is its first run.
+    parent = find_equivalence_roots(num_runs, upper_runs, lower_runs)
+    # Second pass - number the components in the order of their first run and label the pixels of each run.
+    roots, run_components = np.unique(parent, return_inverse=True)
+    run_lengths = run_ends - run_starts
+    MARK = np.zeros((rows, cols), dtype=get_label_dtype(len(roots)))
+    MARK[foreground] = np.repeat(run_components + 1, run_lengths) # The white pixels are in the same order as the runs.
+    return MARK, np.bincount(run_components, weights=run_lengths, minlength=len(roots)).astype(int)
+
+def bfs_connected_components(IMG : np.ndarray, connectivity : int | ArrayLike = 8) -> tuple[np.ndarray, list[tuple[int, int]]]:
+    """Returns all connected components in the image by a breadth-first search from each unvisited white pixel.
+
+    Args:
+        IMG (ndarray): A binary image as a 2D array.
+        connectivity (int | ArrayLike, optional): The neighbours of a pixel (see Neighbourhood). Defaults to 8.
+
+    Returns:
+        tuple[ndarray, list[tuple[int, int]]]: The 2D MARK array and a list of the connected components in the form (connected_component_number, connected_component_size)."""
+    neighbourhood = Neighbourhood(connectivity)
+    is_white = neighbourhood.pad(np.asarray(IMG) == 255, False) # The pixels are found by their flat index (row * padded columns + col) in the padded image, so the border means no neighbour is outside of it.
+    padded_shape = is_white.shape
+    is_white = is_white.ravel()
+    num_white = int(np.count_nonzero(is_white))
+    neighbour_offsets = neighbourhood.flat_offsets(padded_shape[1])
+    MARK = np.zeros(is_white.size, dtype=get_label_dtype(num_white)) # There can't be more connected components than white pixels.
+    queue = NumpyIntQueue(max(num_white, 1), np.int32 if is_white.size <= np.iinfo(np.int32).max else np.int64) # Each white pixel is added once so the queue never overflows.
+    cc_number = 1
+    connected_components = []
+
+    for pixel in np.flatnonzero(is_white).tolist():
+        if MARK[pixel] == 0:
+            MARK[pixel] = cc_number #  Modification - so that you can find the size and number associated with the connected component. 
+            queue.Enqueue(pixel)
+            cc_size = 0 # Modification - so you can find the size of the connected components
+            while not queue.IsEmpty():
+                neighbours = queue.Dequeue() + neighbour_offsets
+                neighbours = neighbours[is_white[neighbours] & (MARK[neighbours] == 0)] #If both the neighbour is a pavement and has not been visited, mark it as visited and add it to the queue.
+                MARK[neighbours] = cc_number
+                queue.EnqueueMany(neighbours)
+                cc_size += 1 # Modification
+            connected_components.append((cc_number, cc_size)) # Modification
+            cc_number += 1 # Modification - It will look for the next connected component so increment the number of the connected component by 1. ==============
+    radius = neighbourhood.radius
+    return MARK.reshape(padded_shape)[radius : padded_shape[0] - radius, radius : padded_shape[1] - radius], connected_components
+
+def detect_connected_components(IMG : ArrayLike, connectivity : int = 8, method : str = "union_find") -> np.ndarray:
+    """Returns all connected components in the image, defined in a 2D array, and saves the connected components and sizes to a text file.
 
     Args:
         IMG (ArrayLike): A binary image as a 2D array.
+        connectivity (int, optional): 8 or 4 (see label_connected_components()). Defaults to 8.
+        method (str, optional): "union_find" (see label_connected_components()) or "bfs" for a breadth-first search. Defaults to "union_find".
 
     Returns:
         ndarray: A 2D ndarray which has a number in each position that indicates which connected component it is associated with (excluding 0 as it indicates that there is no conencted component at that position)."""
@@ -232,37 +567,71 @@ def detect_connected_components(IMG : ArrayLike) -> np.ndarray:
         validate_2D_array(IMG) #raises exceptions if IMG is not in the correct form.
         if not isinstance(IMG, np.ndarray):
             IMG = np.array(IMG, dtype = int)
-        MARK = np.zeros(IMG.shape[:2], dtype=int) # The shape of MARK is the first two elements in the shape of the image as the RGB/ RGBA values are not needed.
-        queue = NumpyQueue(IMG.shape[0] * IMG.shape[1], object) #Maximum size would be if the whole image is connected.
-        cc_number = 1
-        connected_components = []
-
-        for row in range(IMG.shape[0]):
-            for col in range(IMG.shape[1]):
-                if IMG[row, col] == 255 and MARK[row, col] == 0:
-                    MARK[row, col] = cc_number #  Modification - so that you can find the size and number associated with the connected component. 
-                    queue.Enqueue((row, col))
-                    cc_size = 0 # Modification - so you can find the size of the connected components
-                    while not queue.IsEmpty(): 
-                        first_item = queue.Dequeue()
-                        eight_neighbours = find_pixel_neighbours(first_item, IMG.shape)
-                        for neighbour in eight_neighbours:
-                            if IMG[neighbour] == 255 and MARK[neighbour] == 0: #If both the neighbour is a pavement and has not been visited, mark it as visited and add it to the queue.
-                                MARK[neighbour] = cc_number
-                                queue.Enqueue(neighbour)
-                        cc_size += 1 # Modification
-                    connected_components.append((cc_number, cc_size)) # Modification
-                    cc_number += 1 # Modification - It will look for the next connected component so increment the number of the connected component by 1. ==============
+        if method == "union_find":
+            MARK, sizes = label_connected_components(IMG, connectivity)
+            connected_components = list(zip(range(1, len(sizes) + 1), sizes.tolist()))
+        elif method == "bfs":
+            MARK, connected_components = bfs_connected_components(IMG, connectivity)
+        else:
+            raise ValueError("The method must be 'union_find' or 'bfs'")
         save_connected_components_to_file(connected_components, 'cc-output-2a')
         return MARK
     except ValueError as e:
-        if e.args[0] != "The argument IMG must be a 2D array":
+        if not e.args[0].startswith("The "):
             print("The argument passed in IMG only contain integers and be a 2D ArrayLike object.")
         else:
             print(f"Returning to the intelligence module menu - {e}")
 
+def get_component_statistics(MARK : ArrayLike) -> dict[str, np.ndarray]:
+    """Returns the size, bounding box, centroid and perimeter of every connected component in MARK, computed for all of the components at once with bincount and similar reductions.
+
+    Args:
+        MARK (ArrayLike): A 2D array which has a number in each position that indicates which connected component it is associated with (excluding 0 as it indicates that there is no conencted component at that position).
+
+    Raises:
+        ValueError: MARK is not a 2D array.
+
+    Returns:
+        dict[str, ndarray]: The "labels" of the connected components in the order their first pixel occurs (row by row) and, for each of them, their "sizes" (number of pixels), "bounding_boxes" (min_row, min_col, max_row, max_col), "centroids" (mean row, mean column) and "perimeters" (number of pixel edges that border a pixel outside the connected component or the edge of the image)."""
+    validate_2D_array(MARK)
+    MARK = np.asarray(MARK)
+    rows, cols = MARK.shape
+    flat_MARK = MARK.ravel()
+    positions = np.flatnonzero(flat_MARK) # The positions of the pixels in a connected component (row by row).
+    labels, first_positions, pixel_components, sizes = np.unique(flat_MARK[positions], return_index=True, return_inverse=True, return_counts=True)
+    order = np.argsort(first_positions, kind="stable") # np.unique sorts the labels so they are put back in the order their first pixel occurs.
+    components = np.empty(len(labels), dtype=np.intp)
+    components[order] = np.arange(len(labels))
+    pixel_components = components[pixel_components.ravel()]
+    sizes = sizes[order]
+    pixel_rows, pixel_cols = np.divmod(positions, cols)
+
+    num_components = len(labels)
+    bounding_boxes = np.zeros((num_components, 4), dtype=np.intp)
+    bounding_boxes[:, 0] = pixel_rows[first_positions[order]] # The first pixel of a component is in its top row.
+    bounding_boxes[:, 1] = cols
+    np.minimum.at(bounding_boxes[:, 1], pixel_components, pixel_cols)
+    np.maximum.at(bounding_boxes[:, 2], pixel_components, pixel_rows)
+    np.maximum.at(bounding_boxes[:, 3], pixel_components, pixel_cols)
+    centroids = np.column_stack([np.bincount(pixel_components, weights=pixel_rows, minlength=num_components), np.bincount(pixel_components, weights=pixel_cols, minlength=num_components)]) / np.maximum(sizes, 1)[:, None]
+
+    # Each component is numbered from 1 (0 is the background) and a border of 0s is added so every edge of the image is a boundary.
+    neighbourhood = Neighbourhood(4)
+    numbered = neighbourhood.pad(np.zeros((rows, cols), dtype=get_label_dtype(num_components)))
+    numbered[pixel_rows + 1, pixel_cols + 1] = pixel_components + 1
+    numbered_pixels = numbered[1:-1, 1:-1]
+    boundary_pixels = [numbered_pixels[numbered_pixels != neighbours] for neighbours in neighbourhood.neighbour_views(numbered)] # The pixels with a different neighbour above, to the left, to the right and below.
+    perimeters = np.bincount(np.concatenate(boundary_pixels), minlength=num_components + 1)[1:]
+    return {
+        "labels": labels[order],
+        "sizes": sizes,
+        "bounding_boxes": bounding_boxes,
+        "centroids": centroids,
+        "perimeters": perimeters
+    }
+
 def get_connected_components_from_MARK(MARK : ArrayLike) -> list[tuple[int, int]]:
-    """Returns the connected components from MARK as a list of tuples in the form (connected_component_number, connected_component_size).
+    """Returns the connected components from MARK as a list of tuples in the form (connected_component_number, connected_component_size), in the order their first pixel occurs.
 
     Args:
         MARK (ArrayLike): A 2D array which has a number in each position that indicates which connected component it is associated with (excluding 0 as it indicates that there is no conencted component at that position). 
@@ -270,34 +639,25 @@ def get_connected_components_from_MARK(MARK : ArrayLike) -> list[tuple[int, int]
     Returns:
         list[tuple[int, int]]: list of tuples that contain the connected component's number and size respectively."""
     try:
-        validate_2D_array(MARK)
-        if not isinstance(MARK, np.ndarray):
-            MARK = np.array(MARK)
-        connected_component_dict = {}
-        for row in range(MARK.shape[0]):#Iterates over the MARK array and if the number (excluding 0) is present in the dictionary then increment it's value by 1, otherwise add the number as the key to the dictionary.
-            for col in range(MARK.shape[1]):
-                if MARK[row, col] != 0:
-                    if MARK[row, col] not in connected_component_dict.keys():
-                        connected_component_dict[MARK[row, col]] = 1
-                    else:
-                        connected_component_dict[MARK[row, col]] += 1
-        return list(connected_component_dict.items())
+        statistics = get_component_statistics(MARK)
+        return list(zip(statistics["labels"].tolist(), statistics["sizes"].tolist()))
     except ValueError as e:
         if e.args[0] != "The argument IMG must be a 2D array":
             print("The argument passed in IMG only contain integers and be a 2D ArrayLike object.")
         else:
             print(f"Returning to the intelligence module menu - {e}")
 
-def save_connected_components_to_file(connected_components : list[tuple[int, int]], filename : str) -> None:
+def save_connected_components_to_file(connected_components : list[tuple[int, int]], filename : str, directory : str = "./data") -> None:
     """Saves the list of tuples in the form (connected_component_number, connected_component_size) to a text file
 
     Args:
         connected_components (list[tuple[int, int]]): list of conencted components in the form [(connected_component_number, connected_component_size)].
-        filename (str): the name of the file to save the list of connected components in. """
+        filename (str): the name of the file to save the list of connected components in.
+        directory (str, optional): the folder to save the file in. Defaults to "./data". """
     
     try:
         validate_filename(filename)
-        with open(f'./data/{filename}.txt', 'w') as f:
+        with open(os.path.join(directory, f'{filename}.txt'), 'w') as f:
             for number, size in connected_components: #If connected components is not in the correct form, an exception will be raised.
                 if np.issubdtype(type(number), int) and np.issubdtype(type(size), int): #As after get_connected_components_from_MARK() number is of type numpy.int32.
                     f.write(f"Connected Component {number}, number of pixels = {size}\n")
@@ -307,33 +667,401 @@ def save_connected_components_to_file(connected_components : list[tuple[int, int
     except Exception as e:
         print(f"Returning to the intelligence module menu - {e}")
 
+def rank_connected_components(sizes : ArrayLike, k : int = None) -> np.ndarray:
+    """Returns the indexes of the k largest connected components in descending order of size. Connected components of the same size are ranked in the reverse of their original order (the same as sort_connected_components()). The k largest are selected with argpartition (O(n)) so only they have to be sorted.
+
+    Args:
+        sizes (ArrayLike): The size of each connected component.
+        k (int, optional): The number of connected components to return. Defaults to None (all of them).
+
+    Raises:
+        ValueError: k is not a positive integer.
+
+    Returns:
+        ndarray: The indexes of the connected components (in sizes) from the largest to the smallest."""
+    sizes = np.asarray(sizes, dtype=np.int64)
+    if k is not None and (not isinstance(k, int) or k < 1):
+        raise ValueError("The number of connected components must be a positive integer")
+    keys = -(sizes * len(sizes) + np.arange(len(sizes))) # A larger size (or the later component if the sizes are the same) has a smaller key.
+    if k is None or k >= len(sizes):
+        return np.argsort(keys)
+    largest = np.argpartition(keys, k - 1)[:k]
+    return largest[np.argsort(keys[largest])]
+
 def sort_connected_components(connected_components : list[tuple[int, int]]) -> None :
-    for i in range(1, len(connected_components)):
-        found_location = False
-        count = 0
-        # i - count != 0 is to test if the start of the list has been reached.
-        while (not found_location and (i - count) != 0):
-            if connected_components[i - count][1] >= connected_components[i - count - 1][1]:
-                temp = connected_components[i - count - 1]
-                connected_components[i - count - 1] = connected_components[i - count]
-                connected_components[i - count] = temp
-                count += 1
-            else:
-                found_location = True
+    """Sorts a list of connected components in descending order of size (in place). Connected components of the same size are put in the reverse of their original order.
+
+    Args:
+        connected_components (list[tuple[int, int]]): list of connected components in the form [(connected_component_number, connected_component_size)]."""
+    order = rank_connected_components([size for _, size in connected_components])
+    connected_components[:] = [connected_components[index] for index in order]
+
+def find_largest_connected_components(MARK : ArrayLike, k : int = 2) -> list[tuple[int, int]]:
+    """Returns the k largest connected components in MARK, without sorting all of the connected components.
+
+    Args:
+        MARK (ArrayLike): A 2D array which has a number in each position that indicates which connected component it is associated with (0 if there is no connected component).
+        k (int, optional): The number of connected components to return. Defaults to 2.
+
+    Returns:
+        list[tuple[int, int]]: The k largest connected components in the form (connected_component_number, connected_component_size), from the largest to the smallest."""
+    statistics = get_component_statistics(MARK)
+    largest = rank_connected_components(statistics["sizes"], k)
+    return list(zip(statistics["labels"][largest].tolist(), statistics["sizes"][largest].tolist()))
+
+def get_components_mask(MARK : ArrayLike, labels : ArrayLike) -> np.ndarray:
+    """Returns a 2D uint8 array that is 255 where a pixel is in one of the connected components and 0 otherwise, looking up every pixel at once.
+
+    Args:
+        MARK (ArrayLike): A 2D array which has a number in each position that indicates which connected component it is associated with.
+        labels (ArrayLike): The numbers of the connected components to include.
 
-def detect_connected_components_sorted(MARK : ArrayLike ) -> None:
-    """Finds and sorts the connected components in descending order from the array MARK. These are written to a file ('cc-output-2b.txt') and the two largest connected components are saved as an image ('cc-top-2.jpg').
+    Returns:
+        ndarray: A 2D uint8 array of the connected components."""
+    MARK = np.asarray(MARK)
+    labels = np.asarray(labels, dtype=np.int64)
+    if MARK.size != 0 and MARK.dtype.kind in "iu" and MARK.min() >= 0:
+        lookup_table = np.zeros(int(MARK.max()) + 1, dtype=np.uint8) # The value of the output pixel for each connected component number.
+        lookup_table[labels[(labels > 0) & (labels < len(lookup_table))]] = 255
+        return lookup_table[MARK]
+    return np.isin(MARK, labels).astype(np.uint8) * 255
+
+def detect_connected_components_sorted(MARK : ArrayLike, k : int = 2) -> None:
+    """Finds and sorts the connected components in descending order from the array MARK. These are written to a file ('cc-output-2b.txt') and the k largest connected components are saved as an image ('cc-top-k.jpg', e.g. 'cc-top-2.jpg').
     
     Args:
         MARK (ArrayLike): An array that stores the information for the connected components in the image.
+        k (int, optional): The number of the largest connected components to save as an image. Defaults to 2.
     """
-    connected_components = get_connected_components_from_MARK(MARK)
-    sort_connected_components(connected_components) #As connected_components is a list, it is immutable and it's value will be changed from within the function.
-    save_connected_components_to_file(connected_components, 'cc-output-2b')
-    two_biggest_components = [x[0] for x in connected_components[:2]]
-    two_biggest_components_arr = np.full(MARK.shape, 0)
-    for row in range(MARK.shape[0]):
-        for col in range(MARK.shape[1]):
-            if MARK[row, col] in two_biggest_components:
-                two_biggest_components_arr[row, col] = 255
-    mat_plot.imsave('./data/cc-top-2.jpg', two_biggest_components_arr, cmap="gray")
+    try:
+        statistics = get_component_statistics(MARK)
+        order = rank_connected_components(statistics["sizes"])
+        connected_components = list(zip(statistics["labels"][order].tolist(), statistics["sizes"][order].tolist()))
+        save_connected_components_to_file(connected_components, 'cc-output-2b')
+        largest_labels = statistics["labels"][rank_connected_components(statistics["sizes"], k)]
+        mat_plot.imsave(f'./data/cc-top-{k}.jpg', get_components_mask(MARK, largest_labels), cmap="gray")
+    except Exception as e:
+        print(f"Returning to the intelligence module menu - {e}")
+
+def open_raster(map_filename : str, shape : tuple[int, int] = None) -> np.ndarray:
+    """Opens a raster in the data folder as a memory-mapped uint8 array, so only the parts of it that are used are read from the disk.
+
+    Args:
+        map_filename (str): The name of the raster file in the data folder. A '.npy' file (a 2D binary image or a 3D RGB image) or a raw file of the red, green and blue bytes of each pixel (row by row).
+        shape (tuple[int, int], optional): The shape of a raw raster in the form (rows, columns). Defaults to None.
+
+    Raises:
+        ValueError: The shape of a raw raster isn't given or the raster isn't a 2D or 3D array.
+
+    Returns:
+        ndarray: The memory-mapped raster."""
+    validate_filename(map_filename)
+    if map_filename.endswith('.npy'):
+        raster = np.load(f'./data/{map_filename}', mmap_mode='r')
+    elif shape is None:
+        raise ValueError("The shape of a raw RGB raster must be given in the form (rows, columns)")
+    else:
+        raster = np.memmap(f'./data/{map_filename}', dtype=np.uint8, mode='r', shape=(shape[0], shape[1], 3))
+    if raster.ndim not in [2, 3]:
+        raise ValueError("The raster must be a 2D or 3D array")
+    return raster
+
+def iter_tiles(shape : tuple[int, int], tile_size : int) -> tuple[slice, slice]:
+    """Yields the rows and columns of each tile of an image, row by row.
+
+    Args:
+        shape (tuple[int, int]): The shape of the image in the form (rows, columns).
+        tile_size (int): The number of rows and columns in each tile (the tiles at the bottom and right edges may be smaller).
+
+    Raises:
+        ValueError: tile_size is not a positive integer.
+
+    Yields:
+        tuple[slice, slice]: The rows and columns of the tile."""
+    if not isinstance(tile_size, int) or tile_size < 1:
+        raise ValueError("The tile size must be a positive integer")
+    for row in range(0, shape[0], tile_size):
+        for col in range(0, shape[1], tile_size):
+            yield slice(row, min(row + tile_size, shape[0])), slice(col, min(col + tile_size, shape[1]))
+
+def find_seam_equivalences(MARK : np.ndarray, tile_MARK : np.ndarray, rows : slice, cols : slice, connectivity : int) -> tuple[np.ndarray, np.ndarray]:
+    """Returns the pairs of labels of the connected components that touch across the top and left edges of a tile (the tiles above and to the left are already labelled in MARK).
+
+    Args:
+        MARK (ndarray): The 2D array of labels of the whole image.
+        tile_MARK (ndarray): The labels of the tile.
+        rows (slice): The rows of the tile.
+        cols (slice): The columns of the tile.
+        connectivity (int): 8 or 4 (see label_connected_components()).
+
+    Returns:
+        tuple[ndarray, ndarray]: The labels in the tile and the labels outside the tile of the connected components that touch."""
+    offsets = [-1, 0, 1] if connectivity == 8 else [0]
+    tile_labels, neighbour_labels = [], []
+    edges = []
+    if rows.start > 0: # The row above the tile, including the pixels diagonally above its corners.
+        above = np.zeros(tile_MARK.shape[1] + 2, dtype=tile_MARK.dtype)
+        left, right = max(cols.start - 1, 0), min(cols.stop + 1, MARK.shape[1])
+        above[left - cols.start + 1 : right - cols.start + 1] = MARK[rows.start - 1, left:right]
+        edges.append((tile_MARK[0, :], above))
+    if cols.start > 0: # The column to the left of the tile (the pixels diagonally next to its corners are in the row above or the tile below).
+        left_col = np.zeros(tile_MARK.shape[0] + 2, dtype=tile_MARK.dtype)
+        left_col[1:-1] = MARK[rows, cols.start - 1]
+        edges.append((tile_MARK[:, 0], left_col))
+    for edge, neighbours in edges:
+        for offset in offsets:
+            shifted = neighbours[1 + offset : 1 + offset + len(edge)]
+            touching = (edge != 0) & (shifted != 0)
+            tile_labels.append(edge[touching])
+            neighbour_labels.append(shifted[touching])
+    if not tile_labels:
+        return np.zeros(0, dtype=tile_MARK.dtype), np.zeros(0, dtype=tile_MARK.dtype)
+    return np.concatenate(tile_labels), np.concatenate(neighbour_labels)
+
+def detect_connected_components_tiled(raster : ArrayLike | str, colour : str = None, tile_size : int = 1024, connectivity : int = 8, shape : tuple[int, int] = None, output_filename : str = None, upper_threshold : int = 100, lower_threshold : int = 50) -> tuple[np.ndarray, np.ndarray]:
+    """Returns the connected components of a large raster by classifying and labelling it one tile at a time. The labels of the connected components that touch across the edges of the tiles are joined with a union-find, so the memory used (other than MARK) depends on the tile size and not the size of the image. The connected components are numbered the same as label_connected_components().
+
+    Args:
+        raster (ArrayLike | str): A 2D binary image (255 or True where there is a white pixel), a 3D RGB image (0 - 255) or the name of a raster file in the data folder (see open_raster()).
+        colour (str, optional): The colour in COLOUR_RULES of the pixels to find the connected components of in an RGB image (e.g. "red" or "cyan"). Defaults to None (the raster is a binary image).
+        tile_size (int, optional): The number of rows and columns in each tile. Defaults to 1024.
+        connectivity (int, optional): 8 or 4 (see label_connected_components()). Defaults to 8.
+        shape (tuple[int, int], optional): The shape of a raw RGB raster file in the form (rows, columns). Defaults to None.
+        output_filename (str, optional): The name of a '.npy' file in the data folder to write MARK to as a memory-mapped array, instead of keeping it in memory. Defaults to None.
+        upper_threshold (int, optional): The upper threshold of to decide if a channel is high (0 - 255). Defaults to 100.
+        lower_threshold (int, optional): The lower threshold of to decide if a channel is low (0 - 255). Defaults to 50.
+
+    Raises:
+        ValueError: The colour isn't in COLOUR_RULES, there is no colour for an RGB image, the connectivity is not 4 or 8 or the tile size is not a positive integer.
+
+    Returns:
+        tuple[ndarray, ndarray]: The 2D MARK array (0 where there is no connected component), with the smallest unsigned integer dtype that fits a label for every pixel, and the size of each connected component (the size of component n is at index n - 1)."""
+    if isinstance(raster, str):
+        raster = open_raster(raster, shape)
+    if connectivity not in [4, 8]:
+        raise ValueError("The connectivity must be 4 or 8")
+    if raster.ndim == 3 and colour not in COLOUR_RULES:
+        raise ValueError(f"The colour must be one of {list(COLOUR_RULES)} for an RGB image")
+    validate_colour_thresholds(lower_threshold, upper_threshold)
+    rows, cols = raster.shape[:2]
+    label_dtype = get_label_dtype(rows * cols) # Each tile is labelled separately, so the dtype must fit a label for every pixel until they are joined.
+    if output_filename is not None:
+        validate_filename(output_filename)
+        MARK = np.lib.format.open_memmap(f'./data/{output_filename}.npy', mode='w+', dtype=label_dtype, shape=(rows, cols))
+    else:
+        MARK = np.zeros((rows, cols), dtype=label_dtype)
+    # First pass - label each tile with its own labels (numbered after the labels of the previous tiles) and find which labels touch across the edges of the tiles.
+    num_labels = 0
+    label_sizes, label_first_positions, tile_labels, neighbour_labels = [np.zeros(1, dtype=int)], [np.zeros(1, dtype=int)], [], [] # Label 0 is the background.
+    for tile_rows, tile_cols in iter_tiles((rows, cols), tile_size):
+        tile = np.asarray(raster[tile_rows, tile_cols]) # Only the tile is read from a memory-mapped raster.
+        if tile.ndim == 3:
+            tile = classify_colours(tile, {colour: COLOUR_RULES[colour]}, upper_threshold, lower_threshold)[colour]
+        tile_MARK, sizes = label_connected_components(tile, connectivity)
+        tile_MARK = tile_MARK.astype(label_dtype) # The labels of the tile are numbered after the labels of the previous tiles, which may not fit in the tile's dtype.
+        positions = np.flatnonzero(tile_MARK)
+        first_positions = positions[np.unique(tile_MARK.ravel()[positions], return_index=True)[1]] # The first pixel of each label in the tile.
+        first_rows, first_cols = np.divmod(first_positions, tile_MARK.shape[1])
+        label_first_positions.append((first_rows + tile_rows.start) * cols + first_cols + tile_cols.start)
+        label_sizes.append(sizes)
+        tile_MARK[tile_MARK != 0] += num_labels
+        num_labels += len(sizes)
+        seam_tile_labels, seam_neighbour_labels = find_seam_equivalences(MARK, tile_MARK, tile_rows, tile_cols, connectivity)
+        tile_labels.append(seam_tile_labels)
+        neighbour_labels.append(seam_neighbour_labels)
+        MARK[tile_rows, tile_cols] = tile_MARK
+    # Join the labels that touch and number the connected components in the order their first pixel occurs.
+    roots = find_equivalence_roots(num_labels + 1, np.concatenate(tile_labels + [np.zeros(0, dtype=int)]), np.concatenate(neighbour_labels + [np.zeros(0, dtype=int)]))
+    label_first_positions = np.concatenate(label_first_positions)
+    root_first_positions = np.full(num_labels + 1, rows * cols, dtype=int)
+    np.minimum.at(root_first_positions, roots[1:], label_first_positions[1:])
+    component_roots = np.unique(roots[1:])
+    component_numbers = np.zeros(num_labels + 1, dtype=int)
+    component_numbers[component_roots[np.argsort(root_first_positions[component_roots], kind="stable")]] = np.arange(1, len(component_roots) + 1)
+    label_components = component_numbers[roots] # The final number of the connected component of each label (0 stays as the background).
+    # Second pass - relabel each tile.
+    for tile_rows, tile_cols in iter_tiles((rows, cols), tile_size):
+        MARK[tile_rows, tile_cols] = label_components[MARK[tile_rows, tile_cols]]
+    if isinstance(MARK, np.memmap):
+        MARK.flush()
+    sizes = np.bincount(label_components, weights=np.concatenate(label_sizes), minlength=len(component_roots) + 1)[1:].astype(int)
+    return MARK, sizes
+
+def pack_mask(mask : np.ndarray) -> np.ndarray:
+    """Returns a boolean mask packed into 8 pixels per byte (each row is packed separately).
+
+    Args:
+        mask (ndarray): A 2D boolean mask.
+
+    Returns:
+        ndarray: A 2D uint8 array with (columns + 7) // 8 columns."""
+    return np.packbits(mask, axis=1)
+
+def unpack_mask(packed_mask : np.ndarray, cols : int) -> np.ndarray:
+    """Returns the boolean mask that was packed by pack_mask().
+
+    Args:
+        packed_mask (ndarray): The packed mask.
+        cols (int): The number of columns of the mask.
+
+    Returns:
+        ndarray: A 2D boolean mask."""
+    return np.unpackbits(packed_mask, axis=1, count=cols).view(bool)
+
+def get_memory_report(map_filename : str, colour : str = "red", connectivity : int = 8) -> list[dict]:
+    """Runs each stage of the image pipeline (loading, classifying the colour and labelling the connected components) on an image and returns the memory used by the array of each stage.
+
+    Args:
+        map_filename (str): The name of the image file in the data folder.
+        colour (str, optional): The colour in COLOUR_RULES to find the connected components of. Defaults to "red".
+        connectivity (int, optional): 8 or 4 (see label_connected_components()). Defaults to 8.
+
+    Raises:
+        ValueError: The colour isn't in COLOUR_RULES.
+
+    Returns:
+        list[dict]: The "stage", "shape", "dtype" and "bytes" of the array of each stage."""
+    if colour not in COLOUR_RULES:
+        raise ValueError(f"The colour must be one of {list(COLOUR_RULES)}")
+    rgb_img = load_rgb_image(map_filename)
+    mask = classify_colours(rgb_img, {colour: COLOUR_RULES[colour]})[colour]
+    packed_mask = pack_mask(mask)
+    MARK, sizes = label_connected_components(mask, connectivity)
+    stages = [("image", rgb_img), ("colour mask", mask), ("packed colour mask", packed_mask), ("MARK", MARK), ("component sizes", sizes)]
+    return [{"stage": stage, "shape": array.shape, "dtype": str(array.dtype), "bytes": array.nbytes} for stage, array in stages]
+
+MAP_EXTENSIONS = [".png", ".jpg", ".jpeg", ".npy"]
+
+def process_map(map_path : str, output_directory : str, name : str = None, colours : list[str] = ["red", "cyan"], connectivity : int = 8, k : int = 2) -> dict:
+    """Classifies the colours of a map and finds their connected components, saving the outputs with names that start with the name of the map (e.g. 'map-red-pixels.jpg', 'map-red-cc-output.txt' and 'map-red-cc-top-2.jpg').
+
+    Args:
+        map_path (str): The path of the map image.
+        output_directory (str): The folder to save the outputs in.
+        name (str, optional): The name the outputs start with. Defaults to None (the name of the map file without its extension).
+        colours (list[str], optional): The colours in COLOUR_RULES to find. Defaults to ["red", "cyan"].
+        connectivity (int, optional): 8 or 4 (see label_connected_components()). Defaults to 8.
+        k (int, optional): The number of the largest connected components to save as an image. Defaults to 2.
+
+    Raises:
+        ValueError: A colour isn't in COLOUR_RULES.
+
+    Returns:
+        dict: The "map", "name", "rows" and "columns" of the map and, for each colour in "colours", the number of "pixels", the number of "components" and the "largest_components" in the form [connected_component_number, connected_component_size]."""
+    for colour in colours:
+        if colour not in COLOUR_RULES:
+            raise ValueError(f"The colour must be one of {list(COLOUR_RULES)}")
+    directory, map_filename = os.path.split(map_path)
+    if name is None:
+        name = os.path.splitext(map_filename)[0]
+    rgb_img = load_rgb_image(map_filename, directory or ".")
+    masks = classify_colours(rgb_img, {colour: COLOUR_RULES[colour] for colour in colours})
+    summary = {"map": map_path, "name": name, "rows": rgb_img.shape[0], "columns": rgb_img.shape[1], "colours": {}}
+    for colour, mask in masks.items():
+        mat_plot.imsave(os.path.join(output_directory, f"{name}-{colour}-pixels.jpg"), mask.view(np.uint8) * 255, cmap="gray")
+        MARK, sizes = label_connected_components(mask, connectivity)
+        save_connected_components_to_file(list(zip(range(1, len(sizes) + 1), sizes.tolist())), f"{name}-{colour}-cc-output", output_directory)
+        largest = rank_connected_components(sizes, k)
+        mat_plot.imsave(os.path.join(output_directory, f"{name}-{colour}-cc-top-{k}.jpg"), get_components_mask(MARK, largest + 1), cmap="gray")
+        summary["colours"][colour] = {
+            "pixels": int(np.count_nonzero(mask)),
+            "components": len(sizes),
+            "largest_components": [[index + 1, size] for index, size in zip(largest.tolist(), sizes[largest].tolist())]
+        }
+    return summary
+
+def find_map_files(maps : str | list[str]) -> list[str]:
+    """Returns the paths of the maps in a folder (sorted by name), or the list of paths if it is already a list.
+
+    Args:
+        maps (str | list[str]): A folder or a list of paths of maps.
+
+    Raises:
+        FileNotFoundError: The folder doesn't exist.
+
+    Returns:
+        list[str]: The paths of the maps."""
+    if not isinstance(maps, str):
+        return list(maps)
+    if not os.path.isdir(maps):
+        raise FileNotFoundError(f"The folder '{maps}' does not exist")
+    return sorted(path for path in glob.glob(os.path.join(maps, "*")) if os.path.splitext(path)[1].lower() in MAP_EXTENSIONS)
+
+def process_maps(maps : str | list[str], output_directory : str = "./data/batch", colours : list[str] = ["red", "cyan"], connectivity : int = 8, k : int = 2, workers : int = None) -> dict:
+    """Processes a batch of maps with process_map() in separate processes and saves a summary of all of them ('batch-summary.json').
+
+    Args:
+        maps (str | list[str]): A folder of maps (the '.png', '.jpg', '.jpeg' and '.npy' files in it) or a list of paths of maps.
+        output_directory (str, optional): The folder to save the outputs in (it is created if it doesn't exist). Defaults to "./data/batch".
+        colours (list[str], optional): The colours in COLOUR_RULES to find. Defaults to ["red", "cyan"].
+        connectivity (int, optional): 8 or 4 (see label_connected_components()). Defaults to 8.
+        k (int, optional): The number of the largest connected components to save as an image for each map. Defaults to 2.
+        workers (int, optional): The number of processes (None uses every CPU core). 1 processes the maps one after another. Defaults to None.
+
+    Raises:
+        ValueError: workers is not a positive integer or None.
+
+    Returns:
+        dict: The summary of each map that was processed in "maps" (see process_map()), the "map" and "error" of each map that couldn't be processed in "failed" and the total number of "pixels" and "components" of each colour in "totals"."""
+    if workers is not None and (not isinstance(workers, int) or workers < 1):
+        raise ValueError("workers must be a positive integer or None.")
+    map_paths = find_map_files(maps)
+    os.makedirs(output_directory, exist_ok=True)
+    names = []
+    used_names = set()
+    for map_path in map_paths: # Maps with the same name (e.g. in different folders or with different extensions) are numbered so their outputs don't overwrite each other.
+        stem = os.path.splitext(os.path.basename(map_path))[0]
+        name, number = stem, 1
+        while name in used_names:
+            number += 1
+            name = f"{stem}-{number}"
+        used_names.add(name)
+        names.append(name)
+    arguments = [(map_path, output_directory, name, colours, connectivity, k) for map_path, name in zip(map_paths, names)]
+    if workers == 1:
+        results = []
+        for map_arguments in arguments:
+            try:
+                results.append(process_map(*map_arguments))
+            except Exception as e:
+                results.append(e)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor: # Each map is processed in a separate process and the results are returned in the same order as the maps.
+            futures = [executor.submit(process_map, *map_arguments) for map_arguments in arguments]
+            results = [future.exception() or future.result() for future in futures]
+    summary = {"maps": [], "failed": [], "totals": {colour: {"pixels": 0, "components": 0} for colour in colours}}
+    for map_path, result in zip(map_paths, results):
+        if isinstance(result, Exception):
+            summary["failed"].append({"map": map_path, "error": str(result)})
+            continue
+        summary["maps"].append(result)
+        for colour, colour_summary in result["colours"].items():
+            summary["totals"][colour]["pixels"] += colour_summary["pixels"]
+            summary["totals"][colour]["components"] += colour_summary["components"]
+    with open(os.path.join(output_directory, "batch-summary.json"), "w") as f:
+        json.dump(summary, f, indent=4)
+    return summary
+
+def print_batch_summary(summary : dict, output_directory : str) -> None:
+    """Prints the number of connected components of each colour in each map, the maps that couldn't be processed and where the outputs are saved.
+
+    Args:
+        summary (dict): The summary returned by process_maps().
+        output_directory (str): The folder the outputs were saved in."""
+    for map_summary in summary["maps"]:
+        print(f"{map_summary['map']}: " + ", ".join(f"{colour} - {colour_summary['components']} connected components" for colour, colour_summary in map_summary["colours"].items()))
+    for failure in summary["failed"]:
+        print(f"{failure['map']}: failed ({failure['error']})")
+    print(f"Processed {len(summary['maps'])} maps ({len(summary['failed'])} failed), the outputs and summary ('batch-summary.json') are saved in {output_directory}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Finds the red and cyan pixels and their connected components in a batch of maps.")
+    parser.add_argument("maps", nargs="+", help="a folder of maps or the paths of the maps")
+    parser.add_argument("-o", "--output-directory", default="./data/batch", help="the folder to save the outputs in (default: ./data/batch)")
+    parser.add_argument("-c", "--colours", nargs="+", default=["red", "cyan"], choices=list(COLOUR_RULES), help="the colours to find (default: red cyan)")
+    parser.add_argument("--connectivity", type=int, default=8, choices=[4, 8], help="the connectivity of the connected components (default: 8)")
+    parser.add_argument("-k", "--top", type=int, default=2, help="the number of the largest connected components to save as an image (default: 2)")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="the number of processes (default: every CPU core)")
+    args = parser.parse_args()
+    maps = args.maps[0] if len(args.maps) == 1 and os.path.isdir(args.maps[0]) else args.maps
+    print_batch_summary(process_maps(maps, args.output_directory, args.colours, args.connectivity, args.top, args.workers), args.output_directory)
@@ -38,6 +38,7 @@ def main_menu() -> None:
 def reporting_menu() -> None:
     """Displays the options for the reporting module"""
     repeat_again = True
+    session = ReportingSession() # The data is loaded once and the results of the reporting functions are memoized.
     while repeat_again:
         #Prints the options of the reporting module
         print("DA - Daily average")
@@ -89,27 +90,29 @@ def reporting_menu() -> None:
                 elif pollutant == "q":
                     return
 
-            data = get_data()
+            if not session.data:
+                session.reload()
+            data = session.data
             if data: #If the return from get_data() is not None...
                 #If, elif statements for the options displayed in the menu.
                 if optionInp == "DA":
-                    daily_averages = daily_average(data, monitoringStation, pollutant)
+                    daily_averages = session.query(daily_average, monitoringStation, pollutant)
                     if daily_averages:
                         print(f"The daily averages for {pollutant.upper()} at {monitoringStation}:")
                         print(f"{','.join([f'{average : .3g}' if type(average) == float else average for average in daily_averages])}")
                 elif optionInp == "DM":
-                    daily_medians = daily_median(data, monitoringStation, pollutant)
+                    daily_medians = session.query(daily_median, monitoringStation, pollutant)
                     if daily_medians:
                         print(f"The daily medians for {pollutant.upper()} at {monitoringStation}:")
                         print(f"{','.join(f'{median : .3g}' if type(median) == float else median for median in daily_medians)}")
                 elif optionInp == "HA":
-                    hourly_averages = hourly_average(data, monitoringStation, pollutant)
+                    hourly_averages = session.query(hourly_average, monitoringStation, pollutant)
                     print(f"The hourly averages of {pollutant.upper()} at {monitoringStation} are:")
                     print(f"{'Hour' : <25}{'Average value' : <25}")
                     for index, average in enumerate(hourly_averages, start= 1):
-                        print(f"{f'{index : 03d}:00:00' :<25}{f'{average : .3g}' : <25}")
+                        print(f"{f'{index : 03d}:00:00' :<25}{f'{average : .3g}' if type(average) == float else average : <25}")
                 elif optionInp == "MA":
-                    monthly_averages = monthly_average(data, monitoringStation, pollutant)
+                    monthly_averages = session.query(monthly_average, monitoringStation, pollutant)
                     print(f"The monthly averages of {pollutant.upper()} at {monitoringStation} are:")
                     print(f"{'Month' : <25}{'Average Value' : <25}")
                     for index, average in enumerate(monthly_averages, start = 1):
@@ -129,10 +132,10 @@ def reporting_menu() -> None:
                         except Exception:
                             print("The date must be in the form YYYY-MM-DD")
 
-                    peak_hour = peak_hour_date(data, date, monitoringStation, pollutant)
+                    peak_hour = session.query(peak_hour_date, monitoringStation, pollutant, date)
                     print(f"The peak pollution of {pollutant.upper()} occured at {peak_hour[0]} with a value of {peak_hour[1]} on the {date}")
                 elif optionInp == "CMD":
-                    count = count_missing_data(data, monitoringStation, pollutant)
+                    count = session.query(count_missing_data, monitoringStation, pollutant)
                     print(f"There are {count} missing data entries for {pollutant.upper()} at {monitoringStation}")
                 elif optionInp == "FMD":
                     new_value = 0
@@ -145,7 +148,7 @@ def reporting_menu() -> None:
                         except:
                             print(f"'{new_value}' is not a valid input (must be an integer or float)")
                     copy_of_data = fill_missing_data(data, new_value, monitoringStation, pollutant)
-                    print(f"Original data has {count_missing_data(data, monitoringStation, pollutant)} missing data entries")
+                    print(f"Original data has {session.query(count_missing_data, monitoringStation, pollutant)} missing data entries")
                     print(f"Copy of data has {count_missing_data(copy_of_data, monitoringStation, pollutant)} missing data entries")
         else:
             print("Invalid input")
@@ -186,6 +189,8 @@ def intelligence_menu() -> None:
         print("C - Find cyan pixels in the image specified")
         print("D - Detect connected components")
         print("S - Detect sorted connected components")
+        print("M - Show the memory used by each stage of the image pipeline")
+        print("B - Batch process the maps in a folder")
         print("Q - Quit to main menu")
         inp = input("Enter option: \t").upper()
         match inp:
@@ -211,6 +216,20 @@ def intelligence_menu() -> None:
                     detect_connected_components_sorted(MARK)
                 else:
                     print("Please choose the option '(D)etect connected components' first then try again")
+            case "B":
+                folder = input("Enter the folder of the maps: \t")
+                try:
+                    output_directory = "./data/batch"
+                    print_batch_summary(process_maps(folder, output_directory), output_directory)
+                except Exception as e:
+                    print(f"Returning to the intelligence module menu - {e}")
+            case "M":
+                try:
+                    print(f"{'Stage' : <25}{'Shape' : <20}{'Type' : <10}{'Bytes' : <15}")
+                    for stage in get_memory_report('map.png'):
+                        print(f"{stage['stage'] : <25}{str(stage['shape']) : <20}{stage['dtype'] : <10}{stage['bytes'] : <15}")
+                except Exception as e:
+                    print(f"Returning to the intelligence module menu - {e}")
 
             case "Q":
                 repeat_again = False
@@ -1,41 +1,196 @@
 from utils import *
 import numpy as np
-import copy #https://docs.python.org/3/library/copy.html
+import warnings
+import os
+import glob
+import itertools
+import inspect
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 
-def get_data(monitoring_station_files : list[str] = ["Harlington", "Marylebone Road", "N Kensington"]) -> dict[str,object]:
+STATION_DATA_DTYPE = np.dtype([
+    ("date", "datetime64[h]"), # The start of the hour that the measurement covers (the CSV labels the end of the hour e.g. 01:00:00 ... 24:00:00).
+    ("no", np.float64),
+    ("pm10", np.float64),
+    ("pm25", np.float64)
+])
+
+CACHE_DIRECTORY = "./data/.cache"
+
+CHUNK_SIZE = 8192 # The number of CSV lines parsed at once.
+
+AGGREGATE_FUNCTIONS = {
+    "sum": np.nansum,
+    "mean": np.nanmean,
+    "median": np.nanmedian,
+    "min": np.nanmin,
+    "max": np.nanmax
+}
+
+def parse_station_lines(lines : list[str]) -> np.ndarray:
+    """Returns a structured array of the pollution data in the CSV lines (excluding the header line) passed in.
+
+    Args:
+        lines (list[str]): lines from a monitoring station CSV file in the form 'date,time,no,pm10,pm25'.
+
+    Returns:
+        np.ndarray: a structured array (dtype STATION_DATA_DTYPE) with a datetime64 'date' column and a float64 column for each pollutant ("No data" is stored as NaN)."""
+    rows = [line.rstrip().split(',') for line in lines if line.strip()]
+    station_data = np.empty(len(rows), dtype=STATION_DATA_DTYPE)
+    if len(rows) == 0:
+        return station_data
+    dates, times, *pollutant_columns = zip(*rows)
+    hours = np.array([time[:2] for time in times]).astype(np.int64)
+    station_data["date"] = np.array(dates, dtype="datetime64[D]") + (hours - 1).astype("timedelta64[h]") # 24:00:00 is the last hour of the same day.
+    for name, column in zip(STATION_DATA_DTYPE.names[1:], pollutant_columns):
+        column = np.array(column)
+        station_data[name] = np.where(column == "No data", "nan", column).astype(np.float64)
+    return station_data
+
+def count_data_lines(file_path : str) -> int:
+    """Returns the number of data lines (excluding the header line) in a CSV file without loading the whole file into memory.
+
+    Args:
+        file_path (str): the path of the CSV file.
+
+    Returns:
+        int: the number of lines in the file after the header line."""
+    num_lines = 0
+    last_block = b"\n"
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(2 ** 20), b""): # Reads the file in 1 MiB blocks.
+            num_lines += block.count(b"\n")
+            last_block = block
+    if not last_block.endswith(b"\n"): # The last line doesn't end with a new line character.
+        num_lines += 1
+    return max(num_lines - 1, 0)
+
+def iter_station_chunks(file_path : str, chunk_size : int = CHUNK_SIZE):
+    """Yields the data in a monitoring station's CSV file as structured arrays of at most chunk_size rows, so only one chunk of the file is in memory at a time.
+
+    Args:
+        file_path (str): the path of the CSV file.
+        chunk_size (int, optional): the maximum number of lines parsed at once. Defaults to CHUNK_SIZE.
+
+    Yields:
+        np.ndarray: a structured array of the next chunk of lines (see parse_station_lines())."""
+    if not isinstance(chunk_size, int) or chunk_size < 1:
+        raise ValueError("chunk_size must be a positive integer.")
+    with open(file_path, 'r') as f:
+        f.readline() # The first line contains the column headers.
+        lines = list(itertools.islice(f, chunk_size))
+        while lines:
+            yield parse_station_lines(lines)
+            lines = list(itertools.islice(f, chunk_size))
+
+def select_date_range(station_data : np.ndarray, start_date : str = None, end_date : str = None) -> np.ndarray:
+    """Returns a copy of the rows of station data that are between two dates (inclusive).
+
+    Args:
+        station_data (np.ndarray): the data of a monitoring station (see parse_station_lines()).
+        start_date (str, optional): the first date in the form YYYY-MM-DD. Defaults to None (no start date).
+        end_date (str, optional): the last date in the form YYYY-MM-DD. Defaults to None (no end date).
+
+    Returns:
+        np.ndarray: the rows with a date in the range."""
+    if start_date is None and end_date is None:
+        return np.array(station_data)
+    in_range = np.ones(len(station_data), dtype=bool)
+    days = station_data["date"].astype("datetime64[D]")
+    if start_date is not None:
+        in_range &= days >= np.datetime64(start_date, 'D')
+    if end_date is not None:
+        in_range &= days <= np.datetime64(end_date, 'D')
+    return np.array(station_data[in_range])
+
+def read_station_file(file_path : str, start_date : str = None, end_date : str = None, chunk_size : int = CHUNK_SIZE) -> np.ndarray:
+    """Returns the data in a monitoring station's CSV file, parsing the file in chunks so the memory used is the size of the result plus one chunk. The whole file is parsed into a preallocated array, while the rows of a date range are kept from each chunk and joined at the end (so the memory doesn't depend on the length of the file).
+
+    Args:
+        file_path (str): the path of the CSV file.
+        start_date (str, optional): the first date to keep in the form YYYY-MM-DD. Defaults to None (no start date).
+        end_date (str, optional): the last date to keep in the form YYYY-MM-DD. Defaults to None (no end date).
+        chunk_size (int, optional): the maximum number of lines parsed at once. Defaults to CHUNK_SIZE.
+
+    Returns:
+        np.ndarray: a structured array of the data in the date range (see parse_station_lines())."""
+    if start_date is not None or end_date is not None:
+        chunks = [select_date_range(chunk, start_date, end_date) for chunk in iter_station_chunks(file_path, chunk_size)]
+        return np.concatenate(chunks + [np.empty(0, dtype=STATION_DATA_DTYPE)]) # The empty array is so there is something to join if the file has no data.
+    station_data = np.empty(count_data_lines(file_path), dtype=STATION_DATA_DTYPE)
+    num_rows = 0
+    for chunk in iter_station_chunks(file_path, chunk_size):
+        station_data[num_rows : num_rows + len(chunk)] = chunk
+        num_rows += len(chunk)
+    station_data.resize(num_rows, refcheck=False) # Removes the rows that were allocated but were blank lines.
+    return station_data
+
+def load_station_file(station : str, use_cache : bool = True, start_date : str = None, end_date : str = None) -> np.ndarray:
+    """Returns the data from the CSV file of a monitoring station. The parsed data is saved to a binary (.npy) cache which is loaded instead of the CSV file until the CSV file changes.
+
+    Args:
+        station (str): the monitoring station which has data to be read from a CSV file.
+        use_cache (bool, optional): whether the binary cache should be loaded from and saved to. Defaults to True.
+        start_date (str, optional): the first date to load in the form YYYY-MM-DD. Defaults to None (no start date).
+        end_date (str, optional): the last date to load in the form YYYY-MM-DD. Defaults to None (no end date).
+
+    Raises:
+        FileNotFoundError: there is no CSV file for the monitoring station.
+
+    Returns:
+        np.ndarray: a structured array of the data in the CSV file (see parse_station_lines())."""
+    fileName = f"Pollution-London {station}.csv"
+    file_stats = os.stat(f"./data/{fileName}")
+    if not use_cache:
+        return read_station_file(f"./data/{fileName}", start_date, end_date)
+    cache_path = f"{CACHE_DIRECTORY}/{fileName}-{file_stats.st_size}-{file_stats.st_mtime_ns}.npy" # The cache is keyed by the file, its size and when it was last modified.
+    if os.path.exists(cache_path):
+        station_data = np.load(cache_path, mmap_mode='r') # Memory-mapped so only the rows in the date range are copied into memory.
+    else:
+        station_data = read_station_file(f"./data/{fileName}")
+        try: # The cache is only an optimisation, so the parsed data is still returned if it can't be written (e.g. a read-only folder).
+            os.makedirs(CACHE_DIRECTORY, exist_ok=True)
+            for old_cache_path in glob.glob(f"{CACHE_DIRECTORY}/{glob.escape(fileName)}-*-*.npy"): # Removes caches of previous versions of the file.
+                os.remove(old_cache_path)
+            with open(f"{cache_path}.tmp", 'wb') as f:
+                np.save(f, station_data)
+            os.replace(f"{cache_path}.tmp", cache_path) # Renaming the file once it has been written means a partially written cache is never loaded.
+        except OSError:
+            pass
+    return select_date_range(station_data, start_date, end_date)
+
+def get_data(monitoring_station_files : list[str] = ["Harlington", "Marylebone Road", "N Kensington"], use_cache : bool = True, start_date : str = None, end_date : str = None, workers : int = 1) -> dict[str,np.ndarray]:
     """Returns a dictionary containing the data from the files specified in the list 'monitoring_station_files'.
     
     Args:
         monitoring_station_files (list[str]): the monitoring stations which have data to be read from a CSV file.
+        use_cache (bool, optional): whether the data should be loaded from a binary cache of the CSV files when they haven't changed. Defaults to True.
+        start_date (str, optional): the first date to load in the form YYYY-MM-DD. Defaults to None (from the start of the files).
+        end_date (str, optional): the last date to load in the form YYYY-MM-DD. Defaults to None (to the end of the files).
+        workers (int, optional): the number of processes used to load the files concurrently (None uses every CPU core). Defaults to 1 (the files are loaded one after another).
 
     Returns:
-        dict[str,object]: data of the pollutants at the monitoring stations in the format: \n
+        dict[str,np.ndarray]: data of the pollutants at the monitoring stations in the format: \n
         {
-        "station_0" : [ 
-            (date_and_hourly_value, {
-                "no" : nitrous_oxide_value,
-                "pm10" : pm10_value,
-                "pm25" : pm25_value
-            })
-            , ...
-            ]
+        "station_0" : structured array with the columns
+            "date" : datetime64[h] of the start of each hourly measurement,
+            "no" : float64 nitrous oxide values (NaN if there is no data),
+            "pm10" : float64 pm10 values (NaN if there is no data),
+            "pm25" : float64 pm25 values (NaN if there is no data)
         "station_1" : ...
     }"""
     try:
         data_dict = {}
-        for station in monitoring_station_files:
-            fileName = f"Pollution-London {station}.csv"
-            lines = open(f"./data/{fileName}", 'r').readlines()
-            station_list = np.empty(len(lines) - 1, dtype=object) # Initialising the array which will contain the data from the monitoring station.
-            for index, line in enumerate(lines):
-                if index != 0:  # if it isn't the first line where the column headers are specified...
-                    sections = line.rstrip().split(',')
-                    station_list[index - 1] = (f"{sections[0]} {sections[1]}", {  # index - 1 as the first line is not actual data so each line is 1 index behind.
-                        "no": sections[2],
-                        "pm10": sections[3],
-                        "pm25": sections[4]
-                    })
-            data_dict[station] = station_list
+        if workers == 1:
+            for station in monitoring_station_files:
+                data_dict[station] = load_station_file(station, use_cache, start_date, end_date)
+        else:
+            if workers is not None and (not isinstance(workers, int) or workers < 1):
+                raise ValueError("workers must be a positive integer or None.")
+            num_stations = len(monitoring_station_files)
+            with ProcessPoolExecutor(max_workers=workers) as executor: # Each file is parsed in a separate process and the results are returned in the same order as the stations.
+                station_data = executor.map(load_station_file, monitoring_station_files, [use_cache] * num_stations, [start_date] * num_stations, [end_date] * num_stations)
+                data_dict = dict(zip(monitoring_station_files, station_data))
 
         return data_dict
     except FileNotFoundError:
@@ -43,8 +198,363 @@ def get_data(monitoring_station_files : list[str] = ["Harlington", "Marylebone R
     except Exception as e:
         print(f"Something went wrong ({e})")
 
+def parse_percentile(statistic : str) -> float:
+    """Returns the percentile of a statistic in the form "pNN" (e.g. "p95" or "p99.9"), or None if the statistic is not a percentile.
+
+    Args:
+        statistic (str): the name of the statistic."""
+    if isinstance(statistic, str) and statistic[:1] == "p" and statistic[1:].replace('.', '', 1).isdigit() and 0 <= float(statistic[1:]) <= 100:
+        return float(statistic[1:])
+    return None
+
+def get_hourly_labels(dates : np.ndarray, axis : int = 1) -> tuple[np.ndarray, int]:
+    """Returns the group of each time when hourly values are grouped by day (axis = 1) or by hour of the day (axis = 0).
+
+    Args:
+        dates (np.ndarray): the datetime64 start of the hour of each value.
+        axis (int, optional): 1 to group by day (every day from the first to the last date is a group, even if it has no values) or 0 to group by the hour of the day. Defaults to 1.
+
+    Raises:
+        ValueError: an invalid axis is passed into the function.
+
+    Returns:
+        tuple[np.ndarray, int]: the group (label) of each time and the number of groups."""
+    hours = np.asarray(dates, dtype="datetime64[h]")
+    if axis == 0:
+        return (hours - np.datetime64(0, 'h')).astype(np.int64) % 24, 24
+    elif axis == 1:
+        if len(hours) == 0:
+            return np.zeros(0, dtype=np.int64), 0
+        days = hours.astype("datetime64[D]")
+        labels = (days - days.min()).astype(np.int64) # The number of days since the first day.
+        return labels, int(labels.max()) + 1
+    raise ValueError("The axis must be 0 (hour of the day) or 1 (day)")
+
+def aggregate_hourly_values(values : np.ndarray, statistic : str | list[str] = "mean", axis : int = 1, dates : np.ndarray = None) -> list | dict[str, list]:
+    """Returns NaN-aware statistics of hourly values grouped by day (axis = 1) or by hour of the day (axis = 0).
+
+    Args:
+        values (np.ndarray): hourly values of a pollutant (NaN for missing data).
+        statistic (str | list[str], optional): "mean", "median", "min", "max", "sum", "count" or a percentile such as "p95". A list of statistics can be passed to compute them all in one call. Defaults to "mean".
+        axis (int, optional): 1 to get a value for each day, 0 to get a value for each hour of the day. Defaults to 1.
+        dates (np.ndarray, optional): the datetime64 start of the hour of each value, which the values are grouped by so missing rows and leap years are handled. Defaults to None (there are 24 consecutive values for each day, starting at the first hour of a day).
+
+    Raises:
+        IndexError: dates are not passed and the values do not contain 24 values for each day.
+        ValueError: an invalid statistic or axis is passed into the function.
+
+    Returns:
+        list | dict[str, list]: the statistic for each group ("N/A" if a group has no data), or a dictionary of these lists if a list of statistics was passed."""
+    if axis not in [0, 1]:
+        raise ValueError("The axis must be 0 (hour of the day) or 1 (day)")
+    if dates is not None:
+        labels, num_groups = get_hourly_labels(dates, axis)
+        return aggregate_by_labels(values, labels, num_groups, statistic)
+    if len(values) % 24 != 0:
+        raise IndexError("The data does not contain 24 values for each day")
+    hourly_values = np.asarray(values, dtype=np.float64).reshape(-1, 24) # Each row is a day and each column is an hour of the day.
+    counts = np.count_nonzero(~np.isnan(hourly_values), axis=axis)
+    results = {}
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning) # NaN-aware functions warn when a group has no data, these groups are replaced by "N/A".
+        for name in ([statistic] if isinstance(statistic, str) else statistic):
+            if name == "count":
+                results[name] = counts.tolist()
+                continue
+            elif name in AGGREGATE_FUNCTIONS:
+                statistic_values = AGGREGATE_FUNCTIONS[name](hourly_values, axis=axis)
+            elif parse_percentile(name) is not None:
+                statistic_values = np.nanpercentile(hourly_values, parse_percentile(name), axis=axis)
+            else:
+                raise ValueError(f"'{name}' is not a valid statistic")
+            results[name] = [value if count != 0 else "N/A" for value, count in zip(statistic_values.tolist(), counts)]
+    return results[statistic] if isinstance(statistic, str) else results
+
+def group_percentiles(values : np.ndarray, labels : np.ndarray, num_groups : int, percentile : float) -> np.ndarray:
+    """Returns a NaN-aware percentile of values grouped by an integer label, calculated for every group at once. The values are sorted by group (with NaN last in each group) and each group's percentile is interpolated between its two closest ranks, the same as np.nanpercentile().
+
+    Args:
+        values (np.ndarray): the values (NaN for missing data).
+        labels (np.ndarray): the group (0 to num_groups - 1) of each value.
+        num_groups (int): the number of groups.
+        percentile (float): the percentile (0 - 100), e.g. 50 for the median.
+
+    Returns:
+        np.ndarray: the percentile of each group (NaN if a group has no data)."""
+    values = np.asarray(values, dtype=np.float64).ravel()
+    labels = np.asarray(labels, dtype=np.int64).ravel()
+    sorted_values = values[np.lexsort((values, labels))] # Sorted by group then value, NaN is sorted after the other values.
+    group_starts = np.cumsum(np.bincount(labels, minlength=num_groups)) - np.bincount(labels, minlength=num_groups)
+    counts = np.bincount(labels[~np.isnan(values)], minlength=num_groups)
+    results = np.full(num_groups, np.nan)
+    has_data = counts != 0
+    position = (counts[has_data] - 1) * (percentile / 100) # The rank of the percentile in the group, between two values if it isn't a whole number.
+    lower = np.floor(position).astype(np.int64)
+    upper = np.minimum(lower + 1, counts[has_data] - 1)
+    fraction = position - lower
+    lower_values = sorted_values[group_starts[has_data] + lower]
+    upper_values = sorted_values[group_starts[has_data] + upper]
+    difference = upper_values - lower_values
+    results[has_data] = np.where(fraction >= 0.5, upper_values - difference * (1 - fraction), lower_values + difference * fraction) # Interpolated from the closer value, as np.nanpercentile() does.
+    return results
+
+def aggregate_by_labels(values : np.ndarray, labels : np.ndarray, num_groups : int, statistic : str | list[str] = "mean") -> list | dict[str, list]:
+    """Returns NaN-aware statistics of values grouped by an integer label, so values do not need to be in a fixed shape (e.g. 24 per day).
+
+    Args:
+        values (np.ndarray): the values of a pollutant (NaN for missing data).
+        labels (np.ndarray): the group (0 to num_groups - 1) of each value.
+        num_groups (int): the number of groups.
+        statistic (str | list[str], optional): "mean", "median", "min", "max", "sum", "count" or a percentile such as "p95". A list of statistics can be passed to compute them all in one call. Defaults to "mean".
+
+    Raises:
+        ValueError: an invalid statistic is passed into the function.
+
+    Returns:
+        list | dict[str, list]: the statistic for each group ("N/A" if a group has no data), or a dictionary of these lists if a list of statistics was passed."""
+    values = np.asarray(values, dtype=np.float64)
+    labels = np.asarray(labels, dtype=np.int64)
+    is_present = ~np.isnan(values)
+    counts = np.bincount(labels[is_present], minlength=num_groups)
+    sorted_values = None
+    results = {}
+    for name in ([statistic] if isinstance(statistic, str) else statistic):
+        if name == "count":
+            results[name] = counts.tolist()
+            continue
+        elif name in ["sum", "mean"]:
+            statistic_values = np.bincount(labels[is_present], weights=values[is_present], minlength=num_groups) # The sum of each group.
+            if name == "mean":
+                statistic_values = statistic_values / np.maximum(counts, 1)
+        elif name in ["min", "max", "median"] or parse_percentile(name) is not None:
+            if sorted_values is None: # The values are sorted by group once so every group is a contiguous slice.
+                order = np.argsort(labels, kind="stable")
+                sorted_values = values[order]
+                group_starts = np.searchsorted(labels[order], np.arange(num_groups))
+                group_ends = np.r_[group_starts[1:], len(values)]
+            statistic_values = np.full(num_groups, np.nan)
+            if name in ["min", "max"]:
+                is_not_empty = group_ends > group_starts
+                reduce_function = np.fmin if name == "min" else np.fmax # fmin and fmax ignore NaN.
+                statistic_values[is_not_empty] = reduce_function.reduceat(sorted_values, group_starts[is_not_empty])
+            else:
+                statistic_values = group_percentiles(values, labels, num_groups, 50 if name == "median" else parse_percentile(name))
+        else:
+            raise ValueError(f"'{name}' is not a valid statistic")
+        results[name] = [value if count != 0 else "N/A" for value, count in zip(statistic_values.tolist(), counts)]
+    return results[statistic] if isinstance(statistic, str) else results
+
+def get_period_starts(dates : np.ndarray, frequency : str | int | np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Returns the start of the period that each time is in.
+
+    Args:
+        dates (np.ndarray): datetime64 times.
+        frequency (str | int | np.ndarray): "H" (hour), "D" (day), "W" (week starting on Monday), "M" (month), "Q" (quarter), "Y" (year), a number of hours (e.g. 8 for 00:00-08:00, 08:00-16:00 and 16:00-24:00) or a sorted array of datetime64 period starts (a custom calendar).
+
+    Raises:
+        ValueError: an invalid frequency is passed into the function.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: the datetime64 period start of each time and a boolean array that is False for times before the first period of a custom calendar."""
+    hours = np.asarray(dates, dtype="datetime64[h]")
+    is_in_period = np.ones(len(hours), dtype=bool)
+    if isinstance(frequency, np.ndarray):
+        calendar = np.asarray(frequency, dtype="datetime64[h]")
+        period_indexes = np.searchsorted(calendar, hours, side="right") - 1
+        is_in_period = period_indexes >= 0
+        return calendar[np.maximum(period_indexes, 0)], is_in_period
+    elif isinstance(frequency, int) and not isinstance(frequency, bool) and frequency > 0:
+        hours_since_1970 = (hours - np.datetime64(0, 'h')).astype(np.int64)
+        return np.datetime64(0, 'h') + (hours_since_1970 // frequency * frequency).astype("timedelta64[h]"), is_in_period
+    elif frequency == "H":
+        return hours, is_in_period # The times are already the start of each hour (NumPy's hour unit is 'h', not 'H').
+    elif frequency in ["D", "M", "Y"]:
+        return hours.astype(f"datetime64[{frequency}]").astype("datetime64[h]"), is_in_period
+    elif frequency == "W":
+        first_monday = np.datetime64("1970-01-05")
+        days = hours.astype("datetime64[D]")
+        return (first_monday + (days - first_monday) // 7 * 7).astype("datetime64[h]"), is_in_period
+    elif frequency == "Q":
+        months_since_1970 = hours.astype("datetime64[M]").astype(np.int64)
+        return (np.datetime64(0, 'M') + (months_since_1970 - months_since_1970 % 3).astype("timedelta64[M]")).astype("datetime64[h]"), is_in_period
+    raise ValueError(f"'{frequency}' is not a valid frequency")
+
+def resample_values(values : np.ndarray, dates : np.ndarray, frequency : str | int | np.ndarray, statistic : str | list[str] = "mean") -> tuple[np.ndarray, list | dict[str, list]]:
+    """Returns NaN-aware statistics of values grouped into periods (e.g. weekly or quarterly).
+
+    Args:
+        values (np.ndarray): the values of a pollutant (NaN for missing data).
+        dates (np.ndarray): the datetime64 time of each value.
+        frequency (str | int | np.ndarray): the periods to group the values into (see get_period_starts()).
+        statistic (str | list[str], optional): the statistic(s) to calculate (see aggregate_by_labels()). Defaults to "mean".
+
+    Returns:
+        tuple[np.ndarray, list | dict[str, list]]: the datetime64 start of each period that contains values and the statistic for each period."""
+    period_starts, is_in_period = get_period_starts(dates, frequency)
+    periods, labels = np.unique(period_starts[is_in_period], return_inverse=True)
+    return periods, aggregate_by_labels(np.asarray(values)[is_in_period], labels, len(periods), statistic)
+
+def rolling_mean(values : np.ndarray, window : int, dates : np.ndarray = None, min_periods : int = None) -> np.ndarray:
+    """Returns the mean of the values in the window of hours ending at each value (e.g. the 8-hour running mean), using cumulative sums so the time taken doesn't depend on the window size.
+
+    Args:
+        values (np.ndarray): the values of a pollutant (NaN for missing data).
+        window (int): the number of hours in the window.
+        dates (np.ndarray, optional): the datetime64 time of each value, so rows that are not in the data are treated as missing. Defaults to None (the values are consecutive hours).
+        min_periods (int, optional): the minimum number of values in a window for the mean to be calculated. Defaults to None (the whole window must have values).
+
+    Raises:
+        ValueError: the window or min_periods are not positive integers.
+
+    Returns:
+        np.ndarray: the rolling mean at each value (NaN if the window doesn't have enough values)."""
+    if not isinstance(window, int) or window < 1:
+        raise ValueError("window must be a positive integer.")
+    if min_periods is None:
+        min_periods = window
+    if not isinstance(min_periods, int) or min_periods < 1:
+        raise ValueError("min_periods must be a positive integer.")
+    values = np.asarray(values, dtype=np.float64)
+    is_present = ~np.isnan(values)
+    cumulative_sums = np.r_[0, np.cumsum(np.where(is_present, values, 0))]
+    cumulative_counts = np.r_[0, np.cumsum(is_present)]
+    if dates is None:
+        window_starts = np.maximum(np.arange(len(values)) - window + 1, 0)
+    else:
+        hours = (np.asarray(dates, dtype="datetime64[h]") - np.datetime64(0, 'h')).astype(np.int64)
+        window_starts = np.searchsorted(hours, hours - window + 1) # The first value that is in each window.
+    window_ends = np.arange(1, len(values) + 1)
+    sums = cumulative_sums[window_ends] - cumulative_sums[window_starts]
+    counts = cumulative_counts[window_ends] - cumulative_counts[window_starts]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts >= min_periods, sums / counts, np.nan)
+
+def find_exceedances(values : np.ndarray, thresholds : list[float]) -> dict[str, np.ndarray]:
+    """Returns the number of values above each threshold, the number and longest length of the runs of consecutive values above each threshold and the index of the first and last value above each threshold. Every threshold is compared at once.
+
+    Args:
+        values (np.ndarray): the values of a pollutant (NaN for missing data, which never exceeds a threshold).
+        thresholds (list[float]): the thresholds to compare the values against.
+
+    Returns:
+        dict[str, np.ndarray]: arrays with a value for each threshold in the format: \n
+        {
+        "count" : the number of values above the threshold,
+        "runs" : the number of runs of consecutive values above the threshold,
+        "longest_run" : the length of the longest run (0 if there are none),
+        "first" : the index of the first value above the threshold (-1 if there are none),
+        "last" : the index of the last value above the threshold (-1 if there are none)
+    }"""
+    values = np.asarray(values, dtype=np.float64)
+    thresholds = np.asarray(thresholds, dtype=np.float64).reshape(-1)
+    with np.errstate(invalid="ignore"):
+        exceeds = values[np.newaxis, :] > thresholds[:, np.newaxis] # A row for each threshold.
+    counts = np.count_nonzero(exceeds, axis=1)
+    padded_exceeds = np.pad(exceeds.view(np.int8), ((0, 0), (1, 1)))
+    changes = np.diff(padded_exceeds, axis=1)
+    start_rows, starts = np.nonzero(changes == 1)
+    _, ends = np.nonzero(changes == -1) # np.nonzero returns the changes in row order so each start lines up with its end.
+    runs = np.bincount(start_rows, minlength=len(thresholds))
+    longest_runs = np.zeros(len(thresholds), dtype=np.int64)
+    np.maximum.at(longest_runs, start_rows, ends - starts)
+    has_exceedance = counts != 0
+    first = np.where(has_exceedance, np.argmax(exceeds, axis=1), -1)
+    last = np.where(has_exceedance, len(values) - 1 - np.argmax(exceeds[:, ::-1], axis=1), -1)
+    return {"count": counts, "runs": runs, "longest_run": longest_runs, "first": first, "last": last}
+
+def build_calendar_index(station_data : np.ndarray) -> dict[str, dict[str, tuple[int, int]]]:
+    """Returns an index of where each day and month starts and ends in the data of a monitoring station, so the rows of a day or month can be sliced without searching the data.
+
+    Args:
+        station_data (np.ndarray): the data of a monitoring station in chronological order (see parse_station_lines()).
+
+    Returns:
+        dict[str, dict[str, tuple[int, int]]]: the (start, end) row offsets (end is exclusive) in the format: \n
+        {
+        "days" : {"YYYY-MM-DD" : (start, end), ...},
+        "months" : {"YYYY-MM" : (start, end), ...}
+    }"""
+    calendar_index = {}
+    for name, unit in [("days", "D"), ("months", "M")]:
+        periods = station_data["date"].astype(f"datetime64[{unit}]")
+        starts = np.flatnonzero(np.r_[True, periods[1:] != periods[:-1]]) # Indexes where the day/ month changes.
+        ends = np.r_[starts[1:], len(periods)]
+        calendar_index[name] = dict(zip(np.datetime_as_string(periods[starts]).tolist(), zip(starts.tolist(), ends.tolist())))
+    return calendar_index
+
+def build_missing_data_index(station_data : np.ndarray) -> dict[str, dict]:
+    """Returns a bitmap of the missing data entries of each pollutant at a monitoring station and the number of missing entries, so they don't need to be counted on every query.
+
+    Args:
+        station_data (np.ndarray): the data of a monitoring station (see parse_station_lines()).
+
+    Returns:
+        dict[str, dict]: the missing data of each pollutant in the format: \n
+        {
+        "pollutant_0" : {
+            "bitmap" : packed bits (np.packbits()) which are 1 where the data is missing,
+            "count" : the number of missing data entries
+        }
+        "pollutant_1" : ...
+    }"""
+    missing_data_index = {}
+    for pollutant in station_data.dtype.names[1:]:
+        is_missing = np.isnan(station_data[pollutant])
+        missing_data_index[pollutant] = {
+            "bitmap": np.packbits(is_missing),
+            "count": int(np.count_nonzero(is_missing))
+        }
+    return missing_data_index
+
+def get_date_range_slice(station_data : np.ndarray, start_date : str, end_date : str, calendar_index : dict = None) -> slice:
+    """Returns the slice of rows of a monitoring station's data between two dates (inclusive).
+
+    Args:
+        station_data (np.ndarray): the data of a monitoring station in chronological order (see parse_station_lines()).
+        start_date (str): the first date in the form YYYY-MM-DD.
+        end_date (str): the last date in the form YYYY-MM-DD.
+        calendar_index (dict, optional): the index returned from build_calendar_index() for the station data. Defaults to None (the index is built).
+
+    Raises:
+        ValueError: either date is not present in the data.
+
+    Returns:
+        slice: the slice of rows from the start of start_date to the end of end_date."""
+    if calendar_index is None:
+        calendar_index = build_calendar_index(station_data)
+    start_date, end_date = str(np.datetime64(start_date, 'D')), str(np.datetime64(end_date, 'D')) #Raises a ValueError if the dates are not in the form YYYY-MM-DD.
+    if start_date not in calendar_index["days"] or end_date not in calendar_index["days"]:
+        raise ValueError("Date is not found in the CSV file.")
+    return slice(calendar_index["days"][start_date][0], calendar_index["days"][end_date][1])
+
+def get_monitoring_stations(data : dict) -> list[str]:
+    """Returns the monitoring stations in the pollution data.
+
+    Args:
+        data (dict[str, np.ndarray]): the pollution data returned from get_data()."""
+    return list(data.keys())
+
+def get_pollutants(data : dict) -> list[str]:
+    """Returns the pollutants measured at any of the monitoring stations in the pollution data (the columns other than "date").
+
+    Args:
+        data (dict[str, np.ndarray]): the pollution data returned from get_data()."""
+    pollutants = []
+    for station_data in data.values():
+        pollutants += [name for name in station_data.dtype.names if name != "date" and name not in pollutants]
+    return pollutants
+
+def is_valid_station_and_pollutant(data : dict, monitoring_station : str, pollutant : str) -> bool:
+    """Returns whether a monitoring station is in the pollution data and has values for a pollutant.
+
+    Args:
+        data (dict[str, np.ndarray]): the pollution data returned from get_data().
+        monitoring_station (str): the monitoring station.
+        pollutant (str): the pollutant."""
+    return isinstance(data, dict) and monitoring_station in data and pollutant != "date" and pollutant in (data[monitoring_station].dtype.names or ())
+
 def get_daily_averages(data : dict, average_func, monitoring_station: str, pollutant: str) -> list:
-    """Returns a list of daily averages (mean or median) over a year (365 days).
+    """Returns a list of daily averages (mean or median) for each day from the first to the last date in the data.
 
     Args:
         data (dict[str, np.ndarray]): the pollution data returned from get_data()
@@ -58,14 +568,18 @@ def get_daily_averages(data : dict, average_func, monitoring_station: str, pollu
     Returns:
         list: list of daily averages for the particular monitoring station and pollutant"""
     try:
-        if monitoring_station in ["Harlington", "Marylebone Road", "N Kensington"] and pollutant in ["no", "pm10", "pm25"]:
+        if is_valid_station_and_pollutant(data, monitoring_station, pollutant):
+            values = data[monitoring_station][pollutant]
+            dates = data[monitoring_station]["date"]
+            if average_func in [meannvalue, find_median]: # These averages can be calculated for every day at once.
+                return aggregate_hourly_values(values, "mean" if average_func == meannvalue else "median", axis=1, dates=dates)
+            labels, num_days = get_hourly_labels(dates, axis=1) # The values are grouped by their date instead of their position so missing rows don't move values into the wrong day.
+            order = np.argsort(labels, kind="stable")
+            day_starts = np.searchsorted(labels[order], np.arange(num_days + 1))
             average_daily_values = []
-            for i in range(365):
-                hourly_values = []
-                for j in range(24):
-                    value = data[monitoring_station][i * 24 + j][1][pollutant] # i * 24 + j is the index of the current pollutant value as there are 24 data entries per day.
-                    if value != "No data":
-                        hourly_values.append(float(value)) #Parse the value as a float (so the average function can be applied to the list) and add to the list of hourly values.
+            for day in range(num_days):
+                hourly_values = values[order[day_starts[day] : day_starts[day + 1]]]
+                hourly_values = hourly_values[~np.isnan(hourly_values)].tolist() # Missing values are NaN so are removed before the average function is applied.
                 if len(hourly_values) != 0:
                     average_value_for_day = average_func(hourly_values) #Apply the average function (mean or median) to the list of hourly values.
                 else:
@@ -95,7 +609,7 @@ def daily_average(data : dict, monitoring_station: str, pollutant: str) -> list:
         list: list of the mean values of a pollutant for each day."""
     
     try:
-        if monitoring_station in ["Harlington", "Marylebone Road", "N Kensington"] and pollutant in ["no", "pm10", "pm25"]: #Check if monitoring_station and pollutant are valid.
+        if is_valid_station_and_pollutant(data, monitoring_station, pollutant): #Check if monitoring_station and pollutant are valid.
             list_of_daily_means = get_daily_averages(data, meannvalue, monitoring_station, pollutant)
             return list_of_daily_means
         else:
@@ -119,7 +633,7 @@ def daily_median(data : dict, monitoring_station: str, pollutant: str) -> list:
     Returns:
         list:  list of the median values of a pollutant for each day"""
     try:
-        if monitoring_station in ["Harlington", "Marylebone Road", "N Kensington"] and pollutant in ["no", "pm10", "pm25"]:
+        if is_valid_station_and_pollutant(data, monitoring_station, pollutant):
             list_of_daily_medians = get_daily_averages(data, find_median, monitoring_station, pollutant)
             return list_of_daily_medians
         else:
@@ -142,16 +656,8 @@ def hourly_average(data : dict, monitoring_station : str, pollutant : str) -> li
     Returns:
         list: list of the mean values of a pollutant for each hour."""
     try:
-        if monitoring_station in ["Harlington", "Marylebone Road", "N Kensington"] and pollutant in ["no", "pm10", "pm25"]:
-            hour_data = [[] for _ in range(24)] #Initialise a list containing 24 empty lists.
-            for i in range(365):
-                for j in range(24):
-                    value = data[monitoring_station][j + i * 24][1][pollutant]
-                    if value != "No data":
-                        hour_data[j].append(float(value))
-            mean_hour_data = []
-            for i in range(24):
-                mean_hour_data.append(meannvalue(hour_data[i])) #hour_data[i] is the indivdual array of the hourly values in a day of that pollutant.
+        if is_valid_station_and_pollutant(data, monitoring_station, pollutant):
+            mean_hour_data = aggregate_hourly_values(data[monitoring_station][pollutant], "mean", axis=0, dates=data[monitoring_station]["date"]) # The values are grouped by the hour of their time instead of their position.
             return mean_hour_data
         else:
             raise ValueError("Invalid arguments passed (either as monitoring station or pollutant)")
@@ -161,13 +667,14 @@ def hourly_average(data : dict, monitoring_station : str, pollutant : str) -> li
         print(f"Something went wrong, returning to the reporting menu ({e}).")
 
 
-def monthly_average(data : dict, monitoring_station : str, pollutant : str) -> list :
+def monthly_average(data : dict, monitoring_station : str, pollutant : str, calendar_index : dict = None) -> list :
     """Returns the monthly means for a pollutant at a particular pollutant at a monitoring station
 
     Args:
         data (dict[str, np.ndarray]): the pollution data returned from get_data().
         monitoring_station (str): the monitoring station to get the monthly averages for.
         pollutant (str): the pollutant to get the monthly averages for.
+        calendar_index (dict, optional): the index returned from build_calendar_index() for the monitoring station. Defaults to None (the index is built).
 
     Raises:
         ValueError: invalid arguments in monitoring_station or pollutant are passed into the function.
@@ -176,21 +683,14 @@ def monthly_average(data : dict, monitoring_station : str, pollutant : str) -> l
         list: list of the monthly means for a pollutant at a monitoring station."""
 
     try:
-        if monitoring_station in ["Harlington", "Marylebone Road", "N Kensington"] and pollutant in ["no", "pm10", "pm25"]:
+        if is_valid_station_and_pollutant(data, monitoring_station, pollutant):
             monthly_average_data = []
             station_data= data[monitoring_station]
-            index = 0
-            for i in range(12):
-                normal_monthly_data = []
-                same_month = True
-                while same_month:
-                    current_month = station_data[index][0][5:7] #Slice gets the month from the date and time string.
-                    if len(station_data) - 1== index or station_data[index + 1][0][5:7] != current_month: # if you have reached the last data entry or the month has changed then set same_month to false.
-                        same_month = False
-                    value = station_data[index][1][pollutant]
-                    if value != "No data":
-                        normal_monthly_data.append(float(value))
-                    index += 1
+            if calendar_index is None:
+                calendar_index = build_calendar_index(station_data)
+            for start, end in calendar_index["months"].values():
+                monthly_values = station_data[pollutant][start:end]
+                normal_monthly_data = monthly_values[~np.isnan(monthly_values)].tolist()
                 if len(normal_monthly_data) != 0:
                     monthly_average_data.append(meannvalue(normal_monthly_data))
                 else:
@@ -204,7 +704,176 @@ def monthly_average(data : dict, monitoring_station : str, pollutant : str) -> l
         print(f"Something went wrong, returning to the reporting menu ({e}).")
 
 
-def peak_hour_date(data : dict, date : str, monitoring_station : str, pollutant : str) -> tuple:
+def resample(data : dict, monitoring_station : str, pollutant : str, frequency : str | int | np.ndarray = "W", statistic : str = "mean") -> list[tuple[str, any]]:
+    """Returns a statistic of a pollutant at a monitoring station for each period (e.g. each week or quarter).
+
+    Args:
+        data (dict[str, np.ndarray]): the pollution data returned from get_data().
+        monitoring_station (str): the monitoring station to resample the pollutant values of.
+        pollutant (str): the pollutant to resample.
+        frequency (str | int | np.ndarray, optional): the periods to group the values into (see get_period_starts()). Defaults to "W".
+        statistic (str, optional): the statistic to calculate (see aggregate_by_labels()). Defaults to "mean".
+
+    Raises:
+        ValueError: Invalid arguments passed (either as monitoring station, pollutant, frequency or statistic)
+
+    Returns:
+        list[tuple[str, any]]: a list of the start of each period (YYYY-MM-DDTHH) and the statistic for that period ("N/A" if there is no data)."""
+    try:
+        if is_valid_station_and_pollutant(data, monitoring_station, pollutant):
+            station_data = data[monitoring_station]
+            periods, period_values = resample_values(station_data[pollutant], station_data["date"], frequency, statistic)
+            return list(zip(np.datetime_as_string(periods).tolist(), period_values))
+        else:
+            raise ValueError("Invalid arguments passed (either as monitoring station or pollutant)")
+    except Exception as e:
+        print(f"Something went wrong, returning to the reporting menu ({e}).")
+
+
+def rolling_average(data : dict, monitoring_station : str, pollutant : str, window : int = 8, min_periods : int = None) -> list:
+    """Returns the rolling mean of a pollutant at a monitoring station over the window of hours ending at each hour (e.g. the 8-hour running mean).
+
+    Args:
+        data (dict[str, np.ndarray]): the pollution data returned from get_data().
+        monitoring_station (str): the monitoring station to get the rolling means for.
+        pollutant (str): the pollutant to get the rolling means for.
+        window (int, optional): the number of hours in the window. Defaults to 8.
+        min_periods (int, optional): the minimum number of values in a window for the mean to be calculated. Defaults to None (the whole window).
+
+    Raises:
+        ValueError: Invalid arguments passed (either as monitoring station, pollutant, window or min_periods)
+
+    Returns:
+        list: the rolling mean at each hour ("N/A" if the window doesn't have enough values)."""
+    try:
+        if is_valid_station_and_pollutant(data, monitoring_station, pollutant):
+            station_data = data[monitoring_station]
+            rolling_means = rolling_mean(station_data[pollutant], window, station_data["date"], min_periods)
+            return [value if value == value else "N/A" for value in rolling_means.tolist()] # NaN is the only value that isn't equal to itself.
+        else:
+            raise ValueError("Invalid arguments passed (either as monitoring station or pollutant)")
+    except Exception as e:
+        print(f"Something went wrong, returning to the reporting menu ({e}).")
+
+
+def exceedance_report(data : dict, thresholds : dict[str, list[float]], period : str = "hour", monitoring_stations : list[str] = None) -> dict:
+    """Returns the number of hours (or days) that pollutants are above thresholds at monitoring stations, with the length of the runs of exceedances and the times of the first and last exceedance.
+
+    Args:
+        data (dict[str, np.ndarray]): the pollution data returned from get_data().
+        thresholds (dict[str, list[float]]): the thresholds of each pollutant e.g. {"pm10": [50]}.
+        period (str, optional): "hour" to compare the hourly values or "day" to compare the daily means. Defaults to "hour".
+        monitoring_stations (list[str], optional): the monitoring stations to report on. Defaults to None (every monitoring station in the data).
+
+    Raises:
+        ValueError: Invalid arguments passed (either as monitoring station, pollutant or period)
+
+    Returns:
+        dict: the exceedances in the format: \n
+        {
+        "station_0" : {
+            "pollutant_0" : {
+                threshold_0 : {"count" : int, "runs" : int, "longest_run" : int, "first" : str or None, "last" : str or None},
+                ...
+            }
+            ...
+        }
+        ...
+    }"""
+    try:
+        if monitoring_stations is None:
+            monitoring_stations = list(data.keys())
+        if period not in ["hour", "day"]:
+            raise ValueError("The period must be 'hour' or 'day'")
+        report = {}
+        for monitoring_station in monitoring_stations:
+            station_data = data[monitoring_station]
+            report[monitoring_station] = {}
+            for pollutant, pollutant_thresholds in thresholds.items():
+                if not is_valid_station_and_pollutant(data, monitoring_station, pollutant):
+                    raise ValueError("Invalid arguments passed (either as monitoring station or pollutant)")
+                if period == "hour":
+                    values, dates = station_data[pollutant], station_data["date"]
+                else:
+                    daily_means = aggregate_hourly_values(station_data[pollutant], "mean", axis=1, dates=station_data["date"])
+                    values = np.array([mean if mean != "N/A" else np.nan for mean in daily_means])
+                    dates = (station_data["date"].min().astype("datetime64[D]") + np.arange(len(values))) if len(values) != 0 else np.zeros(0, dtype="datetime64[D]")
+                exceedances = find_exceedances(values, pollutant_thresholds)
+                date_strings = np.datetime_as_string(dates)
+                report[monitoring_station][pollutant] = {
+                    threshold: {
+                        "count": int(exceedances["count"][i]),
+                        "runs": int(exceedances["runs"][i]),
+                        "longest_run": int(exceedances["longest_run"][i]),
+                        "first": str(date_strings[exceedances["first"][i]]) if exceedances["first"][i] != -1 else None,
+                        "last": str(date_strings[exceedances["last"][i]]) if exceedances["last"][i] != -1 else None
+                    }
+                    for i, threshold in enumerate(pollutant_thresholds)
+                }
+        return report
+    except Exception as e:
+        print(f"Something went wrong, returning to the reporting menu ({e}).")
+
+
+def aggregate_all(data : dict, statistic : str = "mean", frequency : str | int | np.ndarray = "D", monitoring_stations : list[str] = None, pollutants : list[str] = None) -> dict:
+    """Returns a statistic of every pollutant at every monitoring station for each period as a single array, calculated on the stacked data of all monitoring stations at once.
+
+    Args:
+        data (dict[str, np.ndarray]): the pollution data returned from get_data().
+        statistic (str, optional): "mean", "median", "min", "max", "sum", "count" or a percentile such as "p95". Defaults to "mean".
+        frequency (str | int | np.ndarray, optional): the periods to group the values into (see get_period_starts()). Defaults to "D".
+        monitoring_stations (list[str], optional): the monitoring stations to include. Defaults to None (every monitoring station in the data).
+        pollutants (list[str], optional): the pollutants to include. Defaults to None (every pollutant in the data).
+
+    Raises:
+        ValueError: Invalid arguments passed (either as statistic or frequency)
+
+    Returns:
+        dict: the results in the format: \n
+        {
+        "monitoring_stations" : [station_0, ...],
+        "pollutants" : [pollutant_0, ...],
+        "periods" : datetime64 array of the start of each period,
+        "values" : array of shape (monitoring stations, pollutants, periods) (NaN where there is no data, or 0 for "count")
+    }"""
+    try:
+        monitoring_stations = get_monitoring_stations(data) if monitoring_stations is None else monitoring_stations
+        pollutants = get_pollutants(data) if pollutants is None else pollutants
+        timeline = np.unique(np.concatenate([data[station]["date"] for station in monitoring_stations])) # Every hour that any monitoring station has data for.
+        stacked_values = np.full((len(monitoring_stations), len(pollutants), len(timeline)), np.nan)
+        for i, station in enumerate(monitoring_stations):
+            positions = np.searchsorted(timeline, data[station]["date"])
+            for j, pollutant in enumerate(pollutants):
+                if pollutant in data[station].dtype.names:
+                    stacked_values[i, j, positions] = data[station][pollutant]
+        period_starts, is_in_period = get_period_starts(timeline, frequency)
+        stacked_values, period_starts = stacked_values[:, :, is_in_period], period_starts[is_in_period]
+        periods, group_starts = np.unique(period_starts, return_index=True) # The timeline is sorted so each period is a contiguous slice.
+        if len(periods) == 0:
+            return {"monitoring_stations": monitoring_stations, "pollutants": pollutants, "periods": periods, "values": np.zeros((len(monitoring_stations), len(pollutants), 0))}
+        is_present = ~np.isnan(stacked_values)
+        counts = np.add.reduceat(is_present, group_starts, axis=2)
+        if statistic == "count":
+            return {"monitoring_stations": monitoring_stations, "pollutants": pollutants, "periods": periods, "values": counts}
+        elif statistic in ["sum", "mean"]:
+            results = np.add.reduceat(np.where(is_present, stacked_values, 0), group_starts, axis=2)
+            if statistic == "mean":
+                results = results / np.maximum(counts, 1)
+        elif statistic in ["min", "max"]:
+            results = (np.fmin if statistic == "min" else np.fmax).reduceat(stacked_values, group_starts, axis=2)
+        elif statistic == "median" or parse_percentile(statistic) is not None:
+            num_series = len(monitoring_stations) * len(pollutants)
+            series_labels = np.arange(num_series)[:, None] * len(periods) + np.searchsorted(periods, period_starts) # Every period of every monitoring station and pollutant is a separate group.
+            results = group_percentiles(stacked_values.reshape(num_series, -1), series_labels, num_series * len(periods), 50 if statistic == "median" else parse_percentile(statistic)).reshape(counts.shape)
+        else:
+            raise ValueError(f"'{statistic}' is not a valid statistic")
+        results = np.where(counts != 0, results, np.nan)
+        return {"monitoring_stations": monitoring_stations, "pollutants": pollutants, "periods": periods, "values": results}
+    except Exception as e:
+        print(f"Something went wrong, returning to the reporting menu ({e}).")
+
+
+def peak_hour_date(data : dict, date : str, monitoring_station : str, pollutant : str, calendar_index : dict = None) -> tuple:
     """Returns a tuple of the time and value that the max pollution occurs (for a particular pollutant).
 
     Args:
@@ -212,6 +881,7 @@ def peak_hour_date(data : dict, date : str, monitoring_station : str, pollutant
         date (str): the date to find the hour that the peak pollution occurred.
         monitoring_station (str): the monitoring station to get the hour that peak pollution occurred for a pollutant.
         pollutant (str): the pollutant to get the hour that peak pollution occurred for that pollutant.
+        calendar_index (dict, optional): the index returned from build_calendar_index() for the monitoring station. Defaults to None (the index is built).
 
     Raises:
         ValueError: Invalid arguments passed (either as monitoring station or pollutant) or the date specified isn't present in the data from the file(s).
@@ -219,25 +889,17 @@ def peak_hour_date(data : dict, date : str, monitoring_station : str, pollutant
     Returns:
         tuple: a tuple of the time and value of when the maximum pollution occurred"""
     try:
-        if monitoring_station in ["Harlington", "Marylebone Road", "N Kensington"] and pollutant in ["no", "pm10", "pm25"]:
-            found_date = False
-            starting_index = 0
+        if is_valid_station_and_pollutant(data, monitoring_station, pollutant):
             station_data = data[monitoring_station]
-            while not found_date:
-                if station_data[starting_index][0][:10] != date :
-                    starting_index += 1
-                    if starting_index >= len(station_data) -1:
-                        raise ValueError("Date is not found in the CSV file.")
-                else:
-                    found_date = True
+            day = np.datetime64(date, 'D')
+            day_data = station_data[get_date_range_slice(station_data, date, date, calendar_index)] #Raises a ValueError if the date is not present or in the form YYYY-MM-DD.
             max_time = ""
-            max_value = -1 #All pollution values are positive so this will be replaced by a true value instantly
-            for i in range(24):
-                if station_data[starting_index + i][1][pollutant] != "No data":
-                    value = float(station_data[starting_index + i][1][pollutant])
-                    if value > max_value:
-                        max_time = station_data[starting_index + i][0][11:19] #The time that this max pollution occurred.
-                        max_value = value
+            max_value = -1 #All pollution values are positive so this will be replaced by a true value if there is any data for the day.
+            if not np.all(np.isnan(day_data[pollutant])):
+                max_index = np.nanargmax(day_data[pollutant])
+                hour = int((day_data["date"][max_index] - day).astype(int)) + 1 # The CSV labels each hour by its end time.
+                max_time = f"{hour:02d}:00:00" #The time that this max pollution occurred.
+                max_value = float(day_data[pollutant][max_index])
             return max_time, max_value
         else:
             raise ValueError("Invalid arguments passed (either as monitoring station or pollutant)")
@@ -248,13 +910,14 @@ def peak_hour_date(data : dict, date : str, monitoring_station : str, pollutant
     
 
 
-def count_missing_data(data : dict,  monitoring_station : str, pollutant : str) -> int:
+def count_missing_data(data : dict,  monitoring_station : str, pollutant : str, missing_data_index : dict = None) -> int:
     """Returns the number of missing data entries for a given monitoring station and pollutant.
 
     Args:
         data (dict[str, np.ndarray]): the pollution data returned from get_data().
         monitoring_station (str): the monitoring station to count the missing data entries for.
         pollutant (str): the pollutant to count the missing data entries for.
+        missing_data_index (dict, optional): the index returned from build_missing_data_index() for the monitoring station. Defaults to None (the missing entries are counted).
 
     Raises:
         ValueError: Invalid arguments passed (either as monitoring station or pollutant)
@@ -262,12 +925,10 @@ def count_missing_data(data : dict,  monitoring_station : str, pollutant : str)
     Returns:
         int: the number of missing data entries for that pollutant at the monitoring station"""
     try:
-        if monitoring_station in ["Harlington", "Marylebone Road", "N Kensington"] and pollutant in ["no", "pm10", "pm25"]:
-            num_missing_data = 0
-            for i in range(len(data[monitoring_station])):
-                value = data[monitoring_station][i][1][pollutant]
-                if value == "No data":
-                    num_missing_data += 1
+        if is_valid_station_and_pollutant(data, monitoring_station, pollutant):
+            if missing_data_index is not None:
+                return missing_data_index[pollutant]["count"]
+            num_missing_data = int(np.count_nonzero(np.isnan(data[monitoring_station][pollutant]))) # Missing data entries are stored as NaN.
             return num_missing_data
         else:
             raise ValueError("Invalid arguments passed (either as monitoring station or pollutant)")
@@ -275,28 +936,230 @@ def count_missing_data(data : dict,  monitoring_station : str, pollutant : str)
         print(f"Something went wrong, returning to the reporting menu ({e}).")
 
 
-def fill_missing_data(data : dict[str, object], new_value : float,  monitoring_station : str, pollutant : str) -> dict[str,  object]:
-    """Returns a copy of the data with "No data" values replaced by the parameter new_value.
+def get_missing_data_runs(station_data : np.ndarray, pollutant : str, missing_data_index : dict = None) -> np.ndarray:
+    """Returns the start and end row offsets of each run of consecutive missing data entries of a pollutant.
+
+    Args:
+        station_data (np.ndarray): the data of a monitoring station (see parse_station_lines()).
+        pollutant (str): the pollutant to find the runs of missing data for.
+        missing_data_index (dict, optional): the index returned from build_missing_data_index() for the station data. Defaults to None (the missing entries are found).
+
+    Returns:
+        np.ndarray: an array of shape (number of runs, 2) containing the start and end (exclusive) row of each run."""
+    if missing_data_index is not None:
+        is_missing = np.unpackbits(missing_data_index[pollutant]["bitmap"], count=len(station_data)).astype(bool)
+    else:
+        is_missing = np.isnan(station_data[pollutant])
+    changes = np.flatnonzero(np.diff(np.r_[0, is_missing.view(np.int8), 0])) # Runs start where the mask changes from 0 to 1 and end where it changes from 1 to 0.
+    return changes.reshape(-1, 2)
+
+
+def missing_data_report(data : dict,  monitoring_station : str, pollutant : str, missing_data_index : dict = None) -> dict:
+    """Returns a report of the gaps (runs of consecutive missing data entries) of a pollutant at a monitoring station.
+
+    Args:
+        data (dict[str, np.ndarray]): the pollution data returned from get_data().
+        monitoring_station (str): the monitoring station to report the gaps of.
+        pollutant (str): the pollutant to report the gaps of.
+        missing_data_index (dict, optional): the index returned from build_missing_data_index() for the monitoring station. Defaults to None (the missing entries are found).
+
+    Raises:
+        ValueError: Invalid arguments passed (either as monitoring station or pollutant)
+
+    Returns:
+        dict: the report in the format: \n
+        {
+        "missing" : the number of missing data entries,
+        "gaps" : [(start_time, end_time, number_of_hours), ...] where the times are the start of the first and last missing hour,
+        "longest_gap" : the number of hours of the longest gap (0 if there are no gaps),
+        "gaps_per_day" : {"YYYY-MM-DD" : number of gaps starting on that day, ...},
+        "gaps_per_month" : {"YYYY-MM" : number of gaps starting in that month, ...}
+    }"""
+    try:
+        if is_valid_station_and_pollutant(data, monitoring_station, pollutant):
+            station_data = data[monitoring_station]
+            runs = get_missing_data_runs(station_data, pollutant, missing_data_index)
+            lengths = runs[:, 1] - runs[:, 0]
+            start_times = station_data["date"][runs[:, 0]]
+            end_times = station_data["date"][runs[:, 1] - 1]
+            report = {
+                "missing": int(lengths.sum()),
+                "gaps": list(zip(np.datetime_as_string(start_times).tolist(), np.datetime_as_string(end_times).tolist(), lengths.tolist())),
+                "longest_gap": int(lengths.max()) if len(lengths) != 0 else 0
+            }
+            for name, unit in [("gaps_per_day", "D"), ("gaps_per_month", "M")]:
+                periods, counts = np.unique(start_times.astype(f"datetime64[{unit}]"), return_counts=True)
+                report[name] = dict(zip(np.datetime_as_string(periods).tolist(), counts.tolist()))
+            return report
+        else:
+            raise ValueError("Invalid arguments passed (either as monitoring station or pollutant)")
+    except Exception as e:
+        print(f"Something went wrong, returning to the reporting menu ({e}).")
+
+
+def pollutant_summary(data : dict,  monitoring_station : str, pollutant : str) -> dict:
+    """Returns the count, number of missing data entries, mean, variance, minimum and maximum (and the times they occurred) of a pollutant at a monitoring station, calculated in a single pass.
+
+    Args:
+        data (dict[str, np.ndarray]): the pollution data returned from get_data().
+        monitoring_station (str): the monitoring station to summarise the pollutant values for.
+        pollutant (str): the pollutant to summarise.
+
+    Raises:
+        ValueError: Invalid arguments passed (either as monitoring station or pollutant)
+
+    Returns:
+        dict: the summary returned from StatisticsAccumulator.summary() with the times of the minimum and maximum values added as "min_date" and "max_date"."""
+    try:
+        if is_valid_station_and_pollutant(data, monitoring_station, pollutant):
+            accumulator = StatisticsAccumulator()
+            for chunk_start in range(0, len(data[monitoring_station]), CHUNK_SIZE): # Chunks are merged into the accumulator so the summary can be updated as data arrives.
+                accumulator.add_batch(data[monitoring_station][pollutant][chunk_start : chunk_start + CHUNK_SIZE])
+            summary = accumulator.summary()
+            for name in ["min", "max"]:
+                index = summary[f"{name}_index"]
+                summary[f"{name}_date"] = str(data[monitoring_station]["date"][index]) if index is not None else None
+            return summary
+        else:
+            raise ValueError("Invalid arguments passed (either as monitoring station or pollutant)")
+    except Exception as e:
+        print(f"Something went wrong, returning to the reporting menu ({e}).")
+
+
+def fill_missing_values(values : np.ndarray, strategy : str = "constant", new_value : float = None, dates : np.ndarray = None, window : int = 24) -> np.ndarray:
+    """Returns a copy of a pollutant's values with the missing (NaN) values filled using an imputation strategy.
+
+    Args:
+        values (np.ndarray): the values of a pollutant (NaN for missing data).
+        strategy (str, optional): "constant" (new_value), "forward_fill" (the last value before the gap), "linear" (linear interpolation between the values either side of the gap), "hour_mean" (the mean of the values at the same hour of the day) or "rolling_median" (the median of the values in a window centred on the missing value). Defaults to "constant".
+        new_value (float, optional): the value used by the "constant" strategy. Defaults to None.
+        dates (np.ndarray, optional): the datetime64 times of the values, used by the "linear" and "hour_mean" strategies. Defaults to None (the values are hourly and start at midnight).
+        window (int, optional): the number of values in the window of the "rolling_median" strategy. Defaults to 24.
+
+    Raises:
+        ValueError: an invalid strategy or arguments for the strategy are passed into the function.
+
+    Returns:
+        np.ndarray: the filled values. Values that cannot be filled (e.g. before the first value with forward_fill) are left as NaN."""
+    values = np.asarray(values, dtype=np.float64)
+    is_missing = np.isnan(values)
+    if dates is None:
+        hours = np.arange(len(values))
+    else:
+        hours = (np.asarray(dates, dtype="datetime64[h]") - np.datetime64(0, 'h')).astype(np.int64) # Hours since 1970 so the time between values is used.
+    if strategy == "constant":
+        if not is_numeric(new_value):
+            raise ValueError("new_value must be an integer or float.")
+        return np.where(is_missing, new_value, values)
+    filled_values = values.copy()
+    if not np.any(is_missing) or np.all(is_missing):
+        return filled_values
+    if strategy == "forward_fill":
+        last_present_index = np.maximum.accumulate(np.where(is_missing, 0, np.arange(len(values)))) # The index of the last value that is present at each position.
+        filled_values[is_missing] = values[last_present_index[is_missing]]
+    elif strategy == "linear":
+        filled_values[is_missing] = np.interp(hours[is_missing], hours[~is_missing], values[~is_missing]) # Gaps at the start or end are filled with the first or last value.
+    elif strategy == "hour_mean":
+        hour_of_day = hours % 24
+        sums = np.bincount(hour_of_day[~is_missing], weights=values[~is_missing], minlength=24)
+        counts = np.bincount(hour_of_day[~is_missing], minlength=24)
+        with np.errstate(invalid="ignore", divide="ignore"): # Hours without any values are left as NaN.
+            hour_means = sums / counts
+        filled_values[is_missing] = hour_means[hour_of_day[is_missing]]
+    elif strategy == "rolling_median":
+        if not isinstance(window, int) or window < 1:
+            raise ValueError("window must be a positive integer.")
+        padded_values = np.pad(values, (window // 2, window - 1 - window // 2), constant_values=np.nan)
+        missing_windows = np.lib.stride_tricks.sliding_window_view(padded_values, window)[is_missing] # Only the windows centred on missing values are used.
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning) # Windows without any values are left as NaN.
+            filled_values[is_missing] = np.nanmedian(missing_windows, axis=1)
+    else:
+        raise ValueError(f"'{strategy}' is not a valid strategy")
+    return filled_values
+
+def fill_missing_data(data : dict[str, object], new_value : float,  monitoring_station : str, pollutant : str, strategy : str = "constant", window : int = 24) -> dict[str,  object]:
+    """Returns a copy of the data with missing ("No data") values replaced by the parameter new_value (or another imputation strategy). Only the monitoring station's array is copied, the other monitoring stations are shared with the original data.
+
+    The whole structured array of the monitoring station is copied, not just the pollutant's column. Every reporting function (and the indexes of ReportingSession) expects each monitoring station to be a single structured array. NumPy can't make a structured array that shares its other columns with the original array, so an overlay of just the filled column would need every function to handle two layouts. The copy is one row of 32 bytes per hour (about 280 KB for a year) for one monitoring station.
 
     Args:
         data (dict[str, object]): the pollution data returned from get_data().
-        new_value (float): the value to replace empty pollutant entries.
+        new_value (float): the value to replace empty pollutant entries (only used by the "constant" strategy).
         monitoring_station (str): the monitoring station to fill missing data entries for.
         pollutant (str): the pollutant to fill missing data entries for.
+        strategy (str, optional): the imputation strategy (see fill_missing_values()). Defaults to "constant".
+        window (int, optional): the window size of the "rolling_median" strategy. Defaults to 24.
 
     Raises:
-        ValueError: Invalid arguments passed (either as monitoring station or pollutant)
+        ValueError: Invalid arguments passed (either as monitoring station, pollutant or strategy)
 
     Returns:
-        dict[str, np.ndarray]: a copy of the data dictionary passed into the function with the empty pollutant values replaced with the new_value parameter."""
+        dict[str, np.ndarray]: a copy of the data dictionary passed into the function with the empty pollutant values filled."""
     try:
-        if monitoring_station in ["Harlington", "Marylebone Road", "N Kensington"] and pollutant in ["no", "pm10", "pm25"]:
-            data_copy = copy.deepcopy(data)
-            for _, pollution in data_copy[monitoring_station]: # iterates over the tuples and only the dictionary containing the pollutant values is of importance.
-                if pollution[pollutant] == "No data":
-                    pollution[pollutant] = new_value
+        if is_valid_station_and_pollutant(data, monitoring_station, pollutant):
+            data_copy = dict(data) # A shallow copy so only the monitoring station that is filled needs to be copied.
+            station_data = data[monitoring_station].copy() # The whole record array is copied so the filled data is still a single structured array (see the docstring).
+            station_data[pollutant] = fill_missing_values(station_data[pollutant], strategy, new_value, station_data["date"], window)
+            data_copy[monitoring_station] = station_data
             return data_copy
         else:
             raise ValueError("Invalid arguments passed (either as monitoring station or pollutant)")
     except Exception as e:
         print(f"Something went wrong, returning to the reporting module ({e}).")
+
+
+class ReportingSession():
+    """Loads the pollution data once and memoizes the results of the reporting functions so repeated queries are not recalculated."""
+    def __init__(self, monitoring_station_files : list[str] = ["Harlington", "Marylebone Road", "N Kensington"], max_results : int = 64):
+        """Args:
+            monitoring_station_files (list[str], optional): the monitoring stations to load the data of (see get_data()). Defaults to ["Harlington", "Marylebone Road", "N Kensington"].
+            max_results (int, optional): the maximum number of results that are memoized, the least recently used result is removed when this is exceeded. Defaults to 64."""
+        if not isinstance(max_results, int) or max_results < 1:
+            raise ValueError("max_results must be a positive integer.")
+        self.monitoring_station_files = monitoring_station_files
+        self.max_results = max_results
+        self.reload()
+
+    def query(self, reporting_function, monitoring_station : str, pollutant : str, *args) -> any:
+        """Returns the result of a reporting function for the session's data, only calling the function if the result is not memoized.
+
+        Args:
+            reporting_function (function): the reporting function e.g. daily_average() or monthly_average().
+            monitoring_station (str): the monitoring station to pass to the reporting function.
+            pollutant (str): the pollutant to pass to the reporting function.
+            *args: any other arguments which are passed between data and monitoring_station (e.g. the date for peak_hour_date()).
+
+        Returns:
+            any: the result of the reporting function (which should not be modified as it is shared between queries)."""
+        key = (reporting_function.__name__, monitoring_station, pollutant, args)
+        if key in self.results:
+            self.results.move_to_end(key)
+            return self.results[key]
+        parameters = inspect.signature(reporting_function).parameters
+        station_indexes = {name : indexes[monitoring_station] for name, indexes in self.station_indexes.items() if name in parameters and monitoring_station in indexes} # The indexes built when the data was loaded are passed to the functions that accept them.
+        result = reporting_function(self.data, *args, monitoring_station, pollutant, **station_indexes)
+        if result is not None: # The reporting functions return None when something went wrong so these are not memoized.
+            self.results[key] = result
+            if len(self.results) > self.max_results:
+                self.results.popitem(last=False)
+        return result
+
+    def invalidate(self, monitoring_station : str = None, pollutant : str = None) -> None:
+        """Removes the memoized results for a monitoring station and/or pollutant (or all results if neither are specified). This should be called whenever the session's data is modified.
+
+        Args:
+            monitoring_station (str, optional): the monitoring station to remove the results of. Defaults to None (all monitoring stations).
+            pollutant (str, optional): the pollutant to remove the results of. Defaults to None (all pollutants)."""
+        for key in list(self.results.keys()):
+            if (monitoring_station is None or key[1] == monitoring_station) and (pollutant is None or key[2] == pollutant):
+                del self.results[key]
+
+    def reload(self) -> None:
+        """Reloads the data from the CSV files (or their cache), rebuilds the calendar and missing data indexes and removes all memoized results."""
+        self.data = get_data(self.monitoring_station_files)
+        self.station_indexes = {
+            "calendar_index": {station : build_calendar_index(station_data) for station, station_data in (self.data or {}).items()},
+            "missing_data_index": {station : build_missing_data_index(station_data) for station, station_data in (self.data or {}).items()}
+        }
+        self.results = OrderedDict() # Ordered from least to most recently used.
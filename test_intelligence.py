@@ -22,3 +22,108 @@ def test_validate_2D_array_():
     with pytest.raises(ValueError):
         validate_2D_array([1,2,3,4,5])
 
+def test_classify_colours():
+    rgb_img = np.array([[[200, 10, 10], [10, 200, 200]], [[200, 200, 200], [101, 49, 0]]], dtype=np.uint8)
+    masks = classify_colours(rgb_img)
+    assert masks["red"].tolist() == [[True, False], [False, True]]
+    assert masks["cyan"].tolist() == [[False, True], [False, False]]
+
+def test_classify_colours_invalid_rule():
+    with pytest.raises(ValueError):
+        classify_colours(np.zeros((2, 2, 3)), {"grey": ("mid", None, None)})
+
+def test_numpy_queue_order():
+    queue = NumpyQueue(3, object)
+    for item in [(0, 0), (0, 1), (1, 1)]:
+        queue.Enqueue(item)
+    assert [queue.Dequeue() for _ in range(3)] == [(0, 0), (0, 1), (1, 1)]
+    assert queue.IsEmpty()
+
+def test_label_connected_components():
+    IMG = np.array([[255, 0, 0, 0, 0], [255, 0, 0, 255, 0], [0, 0, 255, 0, 0], [255, 0, 255, 0, 0], [0, 255, 0, 255, 255]])
+    MARK, sizes = label_connected_components(IMG, 8)
+    assert np.array_equal(MARK, bfs_connected_components(IMG)[0])
+    assert sizes.tolist() == [2, 7]
+    assert label_connected_components(IMG, 4)[1].tolist() == [2, 1, 2, 1, 1, 2]
+
+def test_get_component_statistics():
+    MARK = np.array([[0, 2, 2], [1, 0, 2], [1, 1, 0]])
+    statistics = get_component_statistics(MARK)
+    assert statistics["labels"].tolist() == [2, 1]
+    assert statistics["sizes"].tolist() == [3, 3]
+    assert statistics["bounding_boxes"].tolist() == [[0, 1, 1, 2], [1, 0, 2, 1]]
+    assert statistics["centroids"].tolist() == [[1 / 3, 5 / 3], [5 / 3, 1 / 3]]
+    assert statistics["perimeters"].tolist() == [8, 8]
+    assert get_connected_components_from_MARK(MARK) == [(2, 3), (1, 3)]
+
+def test_sort_connected_components():
+    connected_components = [(1, 5), (2, 9), (3, 5), (4, 1)]
+    sort_connected_components(connected_components)
+    assert connected_components == [(2, 9), (3, 5), (1, 5), (4, 1)]
+    assert rank_connected_components([5, 9, 5, 1], 2).tolist() == [1, 2]
+
+def test_get_components_mask():
+    MARK = np.array([[0, 2, 2], [1, 0, 3]])
+    assert get_components_mask(MARK, [2, 3]).tolist() == [[0, 255, 255], [0, 0, 255]]
+    assert find_largest_connected_components(MARK, 1) == [(2, 2)]
+
+def test_detect_connected_components_tiled():
+    IMG = np.array([[255, 0, 0, 0, 0], [255, 0, 0, 255, 0], [0, 0, 255, 0, 0], [255, 0, 255, 0, 0], [0, 255, 0, 255, 255]])
+    for connectivity in [4, 8]:
+        MARK, sizes = label_connected_components(IMG, connectivity)
+        tiled_MARK, tiled_sizes = detect_connected_components_tiled(IMG, tile_size=2, connectivity=connectivity)
+        assert np.array_equal(MARK, tiled_MARK)
+        assert sizes.tolist() == tiled_sizes.tolist()
+
+def test_compact_dtypes():
+    assert get_label_dtype(255) == np.uint8
+    assert get_label_dtype(256) == np.uint16
+    mask = np.array([[True, False, True], [False, False, True]])
+    assert np.array_equal(unpack_mask(pack_mask(mask), 3), mask)
+    assert label_connected_components(mask)[0].dtype == np.uint8
+
+def test_numpy_int_queue():
+    queue = NumpyIntQueue(3)
+    queue.EnqueueMany([1, 2])
+    assert queue.Dequeue() == 1
+    queue.EnqueueMany(np.array([3, 4])) # Loops around the end of the array.
+    assert queue.IsFull() and queue.high_water_mark == 3
+    with pytest.raises(OverflowError):
+        queue.Enqueue(5)
+    assert [queue.Dequeue() for _ in range(3)] == [2, 3, 4]
+    with pytest.raises(IndexError):
+        queue.Dequeue()
+    with pytest.raises(TypeError):
+        queue.Enqueue((0, 1))
+
+def test_neighbourhood():
+    assert Neighbourhood(4).offsets.tolist() == [[-1, 0], [0, -1], [0, 1], [1, 0]]
+    assert Neighbourhood(8).flat_offsets(5).tolist() == [-6, -5, -4, -1, 1, 4, 5, 6]
+    with pytest.raises(ValueError):
+        Neighbourhood(np.ones((2, 3)))
+    mask = np.array([[0, 0, 0, 0], [0, 255, 0, 0], [0, 0, 0, 0]])
+    assert dilate_mask(mask, 4).astype(int).tolist() == [[0, 1, 0, 0], [1, 1, 1, 0], [0, 1, 0, 0]]
+    IMG = np.array([[255, 0, 255], [0, 255, 0]])
+    assert bfs_connected_components(IMG, 4)[1] == [(1, 1), (2, 1), (3, 1)]
+
+def test_process_maps(tmp_path):
+    rgb_img = np.zeros((4, 5, 3), dtype=np.uint8)
+    rgb_img[0, :2] = [255, 0, 0]
+    rgb_img[3, 4] = [255, 0, 0]
+    rgb_img[2, 1] = [0, 255, 255]
+    np.save(tmp_path / "first.npy", rgb_img)
+    np.save(tmp_path / "second.npy", rgb_img[::-1])
+    summary = process_maps(str(tmp_path), str(tmp_path / "output"), k=1, workers=1)
+    assert [map_summary["name"] for map_summary in summary["maps"]] == ["first", "second"]
+    assert summary["maps"][0]["colours"]["red"] == {"pixels": 3, "components": 2, "largest_components": [[1, 2]]}
+    assert summary["totals"] == {"red": {"pixels": 6, "components": 4}, "cyan": {"pixels": 2, "components": 2}}
+    assert (tmp_path / "output" / "second-cyan-cc-top-1.jpg").exists()
+
+def test_process_maps_unique_names(tmp_path):
+    rgb_img = np.zeros((2, 2, 3), dtype=np.uint8)
+    (tmp_path / "folder").mkdir()
+    map_paths = [tmp_path / "map-2.npy", tmp_path / "map.npy", tmp_path / "folder" / "map.npy", tmp_path / "map-3.npy"]
+    for map_path in map_paths:
+        np.save(map_path, rgb_img)
+    summary = process_maps([str(map_path) for map_path in map_paths], str(tmp_path / "output"), workers=1)
+    assert [map_summary["name"] for map_summary in summary["maps"]] == ["map-2", "map", "map-3", "map-3-2"]
@@ -1,6 +1,8 @@
-from reporting import daily_average, daily_median, get_data, hourly_average
+from reporting import CACHE_DIRECTORY, group_percentiles, ReportingSession, aggregate_by_labels, aggregate_hourly_values, build_calendar_index, build_missing_data_index, count_missing_data, daily_average, daily_median, fill_missing_data, fill_missing_values, get_data, get_date_range_slice, hourly_average, missing_data_report, monthly_average, peak_hour_date, pollutant_summary, read_station_file, resample, rolling_mean, exceedance_report, find_exceedances, aggregate_all, get_pollutants
+import reporting
 import numpy as np
 import pytest
+import os
 
 
 def test_get_data_keys():
@@ -27,3 +29,177 @@ def test_hourly_average_arguments():
     data = get_data()
     assert not hourly_average(data, "mk", "kl")
 
+def test_get_data_columns():
+    data = get_data()
+    for value in data.values():
+        assert value.dtype.names == ("date", "no", "pm10", "pm25")
+        assert value["date"][0] == np.datetime64("2021-01-01T00")
+
+def test_aggregate_hourly_values_missing_day():
+    values = np.full(48, np.nan)
+    values[24:] = np.arange(24)
+    result = aggregate_hourly_values(values, ["mean", "max", "count"], axis=1)
+    assert result == {"mean": ["N/A", 11.5], "max": ["N/A", 23.0], "count": [0, 24]}
+
+def test_aggregate_hourly_values_invalid_length():
+    with pytest.raises(IndexError):
+        aggregate_hourly_values(np.zeros(25))
+
+def test_get_data_cache():
+    data = get_data()
+    assert any(name.startswith("Pollution-London Harlington.csv-") for name in os.listdir(CACHE_DIRECTORY))
+    cached_data = get_data()
+    for station in data:
+        for column in data[station].dtype.names:
+            assert np.array_equal(data[station][column], cached_data[station][column], equal_nan=column != "date")
+
+def test_get_data_unwritable_cache(tmp_path, monkeypatch):
+    (tmp_path / "file").write_text("")
+    monkeypatch.setattr(reporting, "CACHE_DIRECTORY", str(tmp_path / "file" / "cache")) # The cache folder can't be created inside a file.
+    data = get_data(["Harlington"])
+    assert np.array_equal(data["Harlington"]["no"], get_data(["Harlington"], use_cache=False)["Harlington"]["no"], equal_nan=True)
+
+def test_reporting_session_memoizes_results():
+    session = ReportingSession(max_results=1)
+    daily_averages = session.query(daily_average, "Harlington", "no")
+    assert session.query(daily_average, "Harlington", "no") is daily_averages
+    session.query(monthly_average, "Harlington", "no")
+    assert len(session.results) == 1 # The least recently used result is removed.
+    session.invalidate("Harlington")
+    assert len(session.results) == 0
+
+def test_read_station_file_chunks():
+    station_data = read_station_file("./data/Pollution-London Harlington.csv", chunk_size=1000)
+    assert len(station_data) == 365 * 24
+    assert np.array_equal(station_data["no"], get_data(["Harlington"])["Harlington"]["no"], equal_nan=True)
+
+def test_read_station_file_date_range(monkeypatch):
+    monkeypatch.setattr(reporting, "count_data_lines", None) # The rows of the whole file aren't allocated for a date range.
+    station_data = read_station_file("./data/Pollution-London Harlington.csv", "2021-03-01", "2021-03-01", chunk_size=100)
+    assert len(station_data) == 24
+    assert station_data["date"][0] == np.datetime64("2021-03-01T00")
+
+def test_get_data_date_range():
+    data = get_data(start_date="2021-02-01", end_date="2021-02-28")
+    for value in data.values():
+        assert len(value) == 28 * 24
+        assert value["date"][0] == np.datetime64("2021-02-01T00")
+
+def test_get_data_parallel():
+    data = get_data(use_cache=False, workers=2)
+    assert list(data.keys()) == ["Harlington", "Marylebone Road", "N Kensington"]
+    for station, value in get_data().items():
+        assert np.array_equal(data[station]["pm10"], value["pm10"], equal_nan=True)
+
+def test_build_calendar_index():
+    station_data = get_data(["Harlington"])["Harlington"]
+    calendar_index = build_calendar_index(station_data)
+    assert len(calendar_index["days"]) == 365 and len(calendar_index["months"]) == 12
+    assert calendar_index["days"]["2021-01-02"] == (24, 48)
+    assert get_date_range_slice(station_data, "2021-02-01", "2021-02-28", calendar_index) == slice(744, 1416)
+
+def test_peak_hour_date_missing_date():
+    data = get_data()
+    assert not peak_hour_date(data, "2020-01-01", "Harlington", "no")
+
+def test_pollutant_summary():
+    data = get_data()
+    summary = pollutant_summary(data, "Harlington", "pm10")
+    assert summary["missing"] == count_missing_data(data, "Harlington", "pm10")
+    assert summary["max"] == np.nanmax(data["Harlington"]["pm10"])
+
+def test_fill_missing_values_strategies():
+    values = np.array([np.nan, 1, np.nan, np.nan, 4, np.nan])
+    assert np.array_equal(fill_missing_values(values, "forward_fill"), [np.nan, 1, 1, 1, 4, 4], equal_nan=True)
+    assert np.array_equal(fill_missing_values(values, "linear"), [1, 1, 2, 3, 4, 4])
+    assert np.array_equal(fill_missing_values(values, "constant", 0), [0, 1, 0, 0, 4, 0])
+
+def test_fill_missing_data_copy():
+    data = get_data()
+    data_copy = fill_missing_data(data, 0.0, "Harlington", "no")
+    assert count_missing_data(data_copy, "Harlington", "no") == 0
+    assert count_missing_data(data, "Harlington", "no") > 0
+    assert data_copy["N Kensington"] is data["N Kensington"]
+
+def test_missing_data_report():
+    data = get_data()
+    missing_data_index = build_missing_data_index(data["Harlington"])
+    report = missing_data_report(data, "Harlington", "pm10", missing_data_index)
+    assert report["missing"] == count_missing_data(data, "Harlington", "pm10") == count_missing_data(data, "Harlington", "pm10", missing_data_index)
+    assert report["longest_gap"] == max(length for _, _, length in report["gaps"])
+    assert sum(report["gaps_per_month"].values()) == len(report["gaps"])
+
+def test_aggregate_by_labels():
+    values = np.array([1, np.nan, 3, 5, np.nan, 2])
+    labels = np.array([0, 0, 2, 0, 1, 2])
+    result = aggregate_by_labels(values, labels, 3, ["mean", "median", "min", "max", "count"])
+    assert result == {"mean": [3.0, "N/A", 2.5], "median": [3.0, "N/A", 2.5], "min": [1.0, "N/A", 2.0], "max": [5.0, "N/A", 3.0], "count": [2, 0, 2]}
+
+def test_rolling_mean():
+    values = np.array([1, 2, 3, np.nan, 5])
+    assert np.array_equal(rolling_mean(values, 2), [np.nan, 1.5, 2.5, np.nan, np.nan], equal_nan=True)
+    assert np.array_equal(rolling_mean(values, 2, min_periods=1), [1, 1.5, 2.5, 3, 5])
+
+def test_resample_partial_year():
+    data = get_data(start_date="2021-03-10", end_date="2021-05-20")
+    monthly_means = resample(data, "Harlington", "no", "M")
+    assert [month for month, _ in monthly_means] == ["2021-03-01T00", "2021-04-01T00", "2021-05-01T00"]
+    assert [mean for _, mean in monthly_means] == pytest.approx(monthly_average(data, "Harlington", "no"))
+    hourly_means = resample(data, "Harlington", "no", "H")
+    assert len(hourly_means) == 72 * 24 and hourly_means[0][0] == "2021-03-10T00"
+    assert [np.nan if mean == "N/A" else mean for _, mean in hourly_means] == pytest.approx(data["Harlington"]["no"], nan_ok=True) # Each hour's mean is its value.
+    weekly_means = resample(data, "Harlington", "no", "W")
+    assert weekly_means[0][0] == "2021-03-08T00" and weekly_means[-1][0] == "2021-05-17T00"
+    assert [quarter for quarter, _ in resample(data, "Harlington", "no", "Q")] == ["2021-01-01T00", "2021-04-01T00"]
+    assert aggregate_all(data, "mean", "H")["values"].shape == (3, 3, 72 * 24)
+
+def test_daily_average_missing_rows():
+    data = get_data(["Harlington"])
+    station_data = data["Harlington"]
+    dropped_rows = np.r_[30:60, 100]
+    data_with_missing_rows = {"Harlington": np.delete(station_data, dropped_rows)}
+    daily_averages = daily_average(data_with_missing_rows, "Harlington", "no")
+    assert len(daily_averages) == 365
+    assert daily_averages[1] == pytest.approx(np.nanmean(station_data["no"][24:30]))
+    assert daily_averages[10:] == pytest.approx(daily_average(data, "Harlington", "no")[10:])
+
+def test_daily_median_missing_rows():
+    station_data = np.delete(get_data(["Harlington"])["Harlington"], np.r_[30:60, 100, 500:530])
+    daily_medians = daily_median({"Harlington": station_data}, "Harlington", "no")
+    days = station_data["date"].astype("datetime64[D]")
+    assert len(daily_medians) == 365 and daily_medians[21] == "N/A" # Every row of the 22nd day was dropped.
+    for day, median in zip(np.arange("2021-01-01", "2022-01-01", dtype="datetime64[D]"), daily_medians):
+        if median != "N/A":
+            assert median == pytest.approx(np.nanmedian(station_data["no"][days == day]))
+    assert group_percentiles(np.array([4.0, np.nan, 1.0, 2.0, 7.0]), np.array([0, 0, 0, 2, 2]), 3, 50).tolist()[::2] == [2.5, 4.5]
+
+def test_hourly_average_hour_labels():
+    data = get_data(["Harlington"])
+    hourly_averages = hourly_average(data, "Harlington", "no")
+    assert hourly_averages[23] == pytest.approx(np.nanmean(data["Harlington"]["no"][23::24])) # The 24:00:00 values are the last hour of the day.
+
+def test_find_exceedances():
+    exceedances = find_exceedances(np.array([1, 5, 5, np.nan, 6, 1, 7]), [4, 6])
+    assert exceedances["count"].tolist() == [4, 1]
+    assert exceedances["runs"].tolist() == [3, 1]
+    assert exceedances["longest_run"].tolist() == [2, 1]
+    assert exceedances["first"].tolist() == [1, 6]
+
+def test_exceedance_report():
+    data = get_data()
+    report = exceedance_report(data, {"pm10": [50, 1000]}, monitoring_stations=["Harlington"])
+    assert report["Harlington"]["pm10"][50]["count"] == np.count_nonzero(data["Harlington"]["pm10"] > 50)
+    assert report["Harlington"]["pm10"][1000] == {"count": 0, "runs": 0, "longest_run": 0, "first": None, "last": None}
+
+def test_get_pollutants():
+    assert get_pollutants(get_data()) == ["no", "pm10", "pm25"]
+
+def test_aggregate_all():
+    data = get_data()
+    result = aggregate_all(data, "mean", "D")
+    assert result["values"].shape == (3, 3, 365)
+    daily_means = daily_average(data, "Marylebone Road", "pm25")
+    assert result["values"][1, 2, 5] == pytest.approx(daily_means[5])
+
+    daily_medians = aggregate_all(data, "median", "D")["values"]
+    assert [value if not np.isnan(value) else "N/A" for value in daily_medians[2, 0]] == pytest.approx(daily_median(data, "N Kensington", "no"))
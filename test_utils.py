@@ -1,6 +1,7 @@
-from utils import countvalue, find_median, insertion_sort, maxvalue, meannvalue, minvalue, sumvalues
+from utils import StatisticsAccumulator, countvalue, find_median, insertion_sort, maxvalue, meannvalue, minvalue, sumvalues
 import pytest
-from statistics import mean, median
+import numpy as np
+from statistics import mean, median, pvariance
 def test_sumvalues():
     l = [1,2,3,4,5]
     assert sumvalues(l) == sum(l)
@@ -42,6 +43,20 @@ def test_meannvalue():
     l = [1,2,3,4,5]
     assert meannvalue(l) == mean(l)
 
+def test_reductions_numeric_arrays():
+    a = np.array([3, 1, 5, 5, 2], dtype=np.float32)
+    assert sumvalues(a) == 16
+    assert maxvalue(a) == 2
+    assert minvalue(a) == 1
+    assert meannvalue(a) == 3.2
+    for values in [[1.0, np.nan, 3.0], [np.nan, 1.0, 3.0], [2.0, 1.0, np.nan]]: # NaN gives the same index for a list and an array.
+        assert maxvalue(np.array(values)) == maxvalue(values)
+        assert minvalue(np.array(values)) == minvalue(values)
+
+def test_maxvalue_numpy_types():
+    l = [np.float64(1.5), np.int64(3), 2]
+    assert maxvalue(l) == 1
+
 def test_countvalue():
     l = [1,'2',3,4,5]
     assert countvalue(l, 3) == l.count(3) 
@@ -54,6 +69,15 @@ def test_find__median():
     l = [1,3,2,4,5]
     assert find_median(l) == median(l)
 
+def test_find_median_unmodified():
+    l = [5.0,3.0,float('nan'),1.0,4.0]
+    assert find_median(l) == 3.5
+    assert l[:2] == [5.0, 3.0]
+
+def test_find_median_empty_list():
+    with pytest.raises(ValueError):
+        find_median([])
+
 def test_insertion_sort():
     l = [1,3,2,5,4]
     sorted_l_copy = l.copy()
@@ -63,4 +87,20 @@ def test_insertion_sort():
 def test_insertions_sort_incorrect_type():
     l = [1,4,'2',3, 5]
     with pytest.raises(TypeError):
-        insertion_sort(l)
\ No newline at end of file
+        insertion_sort(l)
+
+def test_statistics_accumulator():
+    l = [4.0, "No data", 1.0, 7.0, float('nan'), 2.0, 7.0]
+    single = StatisticsAccumulator()
+    for value in l:
+        single.add(value)
+    batched = StatisticsAccumulator()
+    batched.add_batch(np.array([4.0, np.nan, 1.0]))
+    rest = StatisticsAccumulator()
+    rest.add_batch(l[3:])
+    batched.merge(rest)
+    for accumulator in [single, batched]:
+        assert accumulator.count == 5 and accumulator.missing == 2
+        assert accumulator.mean == pytest.approx(mean([4, 1, 7, 2, 7]))
+        assert accumulator.variance == pytest.approx(pvariance([4, 1, 7, 2, 7]))
+        assert (accumulator.min_index, accumulator.max_index) == (2, 3)
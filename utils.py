@@ -1,16 +1,44 @@
 import numpy
 
 
+def is_numeric(item) -> bool:
+    """Returns whether a single value is numeric (an int or float, including NumPy integer and float types but not booleans).
+
+    Args:
+        item : any"""
+    return type(item) in [int, float] or isinstance(item, (numpy.integer, numpy.floating))
+
+def homogeneous_numeric_array(values) -> numpy.ndarray:
+    """Returns the values as a 1D NumPy array if they are an array or buffer (e.g. array.array or memoryview) with a numeric dtype, so that they can be reduced without checking each element. Otherwise None is returned (e.g. for lists).
+
+    Args:
+        values : any"""
+    if isinstance(values, numpy.ndarray):
+        values_array = values
+    elif isinstance(values, memoryview) or hasattr(values, "__array_interface__") or hasattr(values, "buffer_info"): # buffer_info is an attribute of array.array.
+        try:
+            values_array = numpy.asarray(values)
+        except (TypeError, ValueError):
+            return None
+    else:
+        return None
+    if values_array.ndim == 1 and values_array.dtype.kind in "iuf": # The dtype only has to be validated once for every element.
+        return values_array
+    return None
+
 def sumvalues(values: list):
     """
     This function sums the values in a list/ array. If a non-numerical value is in the list/array then an exception will be raised.\n
     Args:
         values(list) : list of int or float
     """
+    values_array = homogeneous_numeric_array(values)
+    if values_array is not None:
+        return values_array.sum().item()
     total = 0
     for item in values:
 
-        if type(item) in [int, float, numpy.float64]:
+        if is_numeric(item):
             total += item
         else:
             raise TypeError("An element in the list/array has an incorrect type.")
@@ -25,11 +53,16 @@ def maxvalue(values: list) -> int:
     """
     # Check if the list is empty
     if len(values) != 0:
+        values_array = homogeneous_numeric_array(values)
+        if values_array is not None:
+            if values_array.dtype.kind == "f" and numpy.isnan(values_array).any(): # Like the list path, NaN is only the result if it is the first value (as no value compares greater or less than NaN).
+                return 0 if numpy.isnan(values_array[0]) else int(numpy.nanargmax(values_array))
+            return int(numpy.argmax(values_array))
         maxVal = 0
         maxValIndex = 0
         for i in range(0, len(values)):
             # Validate element data type
-            if type(values[i]) in [int, float]:
+            if is_numeric(values[i]):
                     if values[i] > maxVal or i == 0:
                         maxVal = values[i]
                         maxValIndex = i
@@ -48,10 +81,15 @@ def minvalue(values : list):
     # Check if the list is empty
     length = len(values)
     if length != 0:
+        values_array = homogeneous_numeric_array(values)
+        if values_array is not None:
+            if values_array.dtype.kind == "f" and numpy.isnan(values_array).any(): # Like the list path, NaN is only the result if it is the first value (as no value compares greater or less than NaN).
+                return 0 if numpy.isnan(values_array[0]) else int(numpy.nanargmin(values_array))
+            return int(numpy.argmin(values_array))
 
         for i in range(0, length):
             # Validate element data type
-            if type(values[i]) in [int, float, numpy.float64]:
+            if is_numeric(values[i]):
                 if i == 0:
                     minValIndex = 0 
                     minVal = values[0]
@@ -80,6 +118,11 @@ def countvalue(values, x):
     Args:
         values : list
         x : any"""
+    values_array = homogeneous_numeric_array(values)
+    if values_array is not None:
+        if not issubclass(values_array.dtype.type, type(x)): # Only values of the same type as x are counted.
+            return 0
+        return int(numpy.count_nonzero(values_array == x))
     count = 0
     for item in values:
         if isinstance(item, type(x)) and item == x:
@@ -87,20 +130,47 @@ def countvalue(values, x):
     return count
 
 
+def numeric_array(values) -> numpy.ndarray:
+    """Returns a list/ array of numeric values as a NumPy array (without copying an array that is already numeric). If a non-numerical value is in the list/array then an exception will be raised.
+
+    Args:
+        values : list or array of int or float
+
+    Returns:
+        numpy.ndarray: an array of the values."""
+    if isinstance(values, numpy.ndarray):
+        if values.dtype.kind not in "iuf": # signed integer, unsigned integer or float
+            raise TypeError("The array has an incorrect type.")
+        return values
+    for item in values:
+        if not is_numeric(item):
+            raise TypeError("An element in the list/array has an incorrect type.")
+    return numpy.array(values)
+
+
 def find_median(values: list):
-    '''Returns the median value of a list of values.
+    '''Returns the median value of a list/ array of values. The values are not modified and NaN values are ignored. The middle value(s) are found by partitioning (O(n)) instead of sorting.
 
     Args:
-        values (list) : list of numeric values
+        values (list) : list or array of numeric values
+
+    Raises:
+        TypeError: an element in the list/ array is not numeric.
+        ValueError: there are no values (other than NaN) to find the median of.
     '''
-    sorted_values = insertion_sort(values)
+    values_array = numeric_array(values)
+    if values_array.dtype.kind == "f":
+        values_array = values_array[~numpy.isnan(values_array)]
+    length = len(values_array)
+    if length == 0:
+        raise ValueError("The list of values is empty")
+    middle = length // 2
     # even number of elements in the list. e.g. [1,2,3,4,5,6]
-    if len(sorted_values) % 2 == 0:
-        right_most_middle_element = len(sorted_values) // 2
-        return (sorted_values[right_most_middle_element] + sorted_values[right_most_middle_element - 1]) / 2
+    if length % 2 == 0:
+        partitioned_values = numpy.partition(values_array, [middle - 1, middle]) # Returns a partitioned copy so the values passed in aren't modified.
+        return (partitioned_values[middle - 1].item() + partitioned_values[middle].item()) / 2
     else:  # odd number of elements in the list. e.g. [1,2,3,4,5]
-        # the index will always be an integer as 1 less of an odd number is even.
-        return sorted_values[(len(sorted_values) - 1)//2]
+        return numpy.partition(values_array, middle)[middle].item()
 
 
 def insertion_sort(values: list) -> list:
@@ -129,3 +199,111 @@ def insertion_sort(values: list) -> list:
                 raise TypeError("List of values contains an item(s) of the incorrect type.")
     return values
 
+
+
+class StatisticsAccumulator():
+    """Calculates the count, number of missing values, mean, variance, minimum and maximum (and their indexes) of a series of values in a single pass. Values can be added one at a time or in batches and accumulators of consecutive chunks can be merged."""
+    def __init__(self):
+        self.num_values = 0 # The number of values added, including missing values.
+        self.count = 0 # The number of values that are not missing.
+        self.missing = 0
+        self.mean = 0.0
+        self.sum_of_squared_differences = 0.0 # The sum of the squared differences from the mean (M2 in Welford's algorithm).
+        self.min = None
+        self.max = None
+        self.min_index = None
+        self.max_index = None
+
+    @property
+    def variance(self) -> float:
+        """The population variance of the values that are not missing (None if there are no values)."""
+        if self.count == 0:
+            return None
+        return self.sum_of_squared_differences / self.count
+
+    def add(self, value) -> None:
+        """Adds a single value. None, NaN and "No data" are counted as missing values.
+
+        Args:
+            value : int or float (or a missing value)
+
+        Raises:
+            TypeError: the value is not numeric or missing."""
+        index = self.num_values
+        if value is None or value == "No data" or (is_numeric(value) and value != value): # NaN is the only value that isn't equal to itself.
+            self.num_values += 1
+            self.missing += 1
+            return
+        if not is_numeric(value):
+            raise TypeError("The value has an incorrect type.")
+        self.num_values += 1
+        self.count += 1
+        difference = value - self.mean
+        self.mean += difference / self.count # Welford's algorithm updates the mean and M2 without storing the values.
+        self.sum_of_squared_differences += difference * (value - self.mean)
+        if self.min is None or value < self.min:
+            self.min, self.min_index = value, index
+        if self.max is None or value > self.max:
+            self.max, self.max_index = value, index
+
+    def add_batch(self, values) -> None:
+        """Adds a list/ array of values. Numeric arrays are summarised with NumPy and merged, other values are added one at a time.
+
+        Args:
+            values : list or array of int or float (or missing values)"""
+        values_array = homogeneous_numeric_array(values)
+        if values_array is None:
+            for value in values:
+                self.add(value)
+            return
+        batch = StatisticsAccumulator()
+        batch.num_values = len(values_array)
+        is_present = ~numpy.isnan(values_array) if values_array.dtype.kind == "f" else numpy.ones(len(values_array), dtype=bool)
+        present_values = values_array[is_present]
+        batch.count = len(present_values)
+        batch.missing = batch.num_values - batch.count
+        if batch.count != 0:
+            present_indexes = numpy.flatnonzero(is_present)
+            batch.mean = present_values.mean().item()
+            batch.sum_of_squared_differences = ((present_values - batch.mean) ** 2).sum().item()
+            batch.min_index = present_indexes[numpy.argmin(present_values)].item()
+            batch.max_index = present_indexes[numpy.argmax(present_values)].item()
+            batch.min = values_array[batch.min_index].item()
+            batch.max = values_array[batch.max_index].item()
+        self.merge(batch)
+
+    def merge(self, other : "StatisticsAccumulator") -> None:
+        """Merges the statistics of another accumulator into this one, treating the other accumulator's values as coming after this accumulator's values.
+
+        Args:
+            other (StatisticsAccumulator): the accumulator of the following values (e.g. the next chunk or a worker's results)."""
+        if not isinstance(other, StatisticsAccumulator):
+            raise TypeError("Only a StatisticsAccumulator can be merged.")
+        count = self.count + other.count
+        if other.count != 0:
+            difference = other.mean - self.mean
+            self.sum_of_squared_differences += other.sum_of_squared_differences + difference ** 2 * self.count * other.count / count # Chan et al.'s formula for combining M2 of two sets of values.
+            self.mean += difference * other.count / count
+            if self.min is None or other.min < self.min:
+                self.min, self.min_index = other.min, other.min_index + self.num_values
+            if self.max is None or other.max > self.max:
+                self.max, self.max_index = other.max, other.max_index + self.num_values
+        self.count = count
+        self.missing += other.missing
+        self.num_values += other.num_values
+
+    def summary(self) -> dict:
+        """Returns the statistics as a dictionary.
+
+        Returns:
+            dict: the count, missing, mean, variance, min, max, min_index and max_index of the values."""
+        return {
+            "count": self.count,
+            "missing": self.missing,
+            "mean": self.mean if self.count != 0 else None,
+            "variance": self.variance,
+            "min": self.min,
+            "max": self.max,
+            "min_index": self.min_index,
+            "max_index": self.max_index
+        }